@@ -9,6 +9,8 @@ from application.exceptions import InconsistencyError
 from core.dto import access
 from core.dto.access import EntityId
 from core.dto.service import ScopeConstructor
+from core.server.permissions import PermissionMatrix
+from core.server.session_cache import SessionCache
 from core.utils.crypto import BaseCrypto
 from core.utils.license_count import SysUserLicenses
 from infrastructure.database.models import (MODEL, Building, Claim,
@@ -74,6 +76,7 @@ class SystemUserAccess(BaseAccess):
                         setattr(system_user, field, value)
 
             await system_user.save()
+            await SessionCache.invalidate_user(entity_id)
             return entity_id
 
         except exceptions.ValidationError as ex:
@@ -84,6 +87,7 @@ class SystemUserAccess(BaseAccess):
         await EntityRepository.check_not_exist_or_delete(SystemUser, entity_id)
         await SystemUser.filter(id=entity_id).update(deleted=True)
         await SysUserLicenses.decrement_count()
+        await SessionCache.invalidate_user(entity_id)
         return entity_id
 
 
@@ -215,13 +219,18 @@ class RoleAccess(BaseAccess):
     async def create(self, system_user: SystemUser, dto: access.Role.CreationDto) -> MODEL:
         return await super().create(system_user, dto)
 
-    @atomic(settings.CONNECTION_NAME)
+    # Not atomic: matrix is reloaded by all workers, so changes have to be committed before publishing
     async def update(self, system_user: SystemUser, entity_id: EntityId, dto: access.Role.UpdateDto) -> EntityId:
-        return await super().update(system_user, entity_id, dto)
+        entity_id = await super().update(system_user, entity_id, dto)
+        await PermissionMatrix.publish_reload()
+        await SessionCache.clear()
+        return entity_id
 
-    @atomic(settings.CONNECTION_NAME)
     async def delete(self, system_user: SystemUser, entity_id: EntityId) -> EntityId:
-        return await super().delete(system_user, entity_id)
+        entity_id = await super().delete(system_user, entity_id)
+        await PermissionMatrix.publish_reload()
+        await SessionCache.clear()
+        return entity_id
 
 
 class ScopeConstructorAccess(BaseAccess):
@@ -231,9 +240,17 @@ class ScopeConstructorAccess(BaseAccess):
     async def create(self, system_user: SystemUser, dto: ScopeConstructor.UpdateDto) -> MODEL:
         raise InconsistencyError(message="Creating new scopes is prohibited.")
 
-    @atomic(settings.CONNECTION_NAME)
     async def update(self, system_user: SystemUser, entity_id: EntityId, dto: ScopeConstructor.UpdateDto,
                      request: Request) -> EntityId:
+        enable_scope, roles = await self._set_scope_roles(entity_id, dto)
+        # Broadcasting to all workers only after the transaction is committed
+        await PermissionMatrix.publish_route(enable_scope.id, enable_scope.name,
+                                             [(role.id, role.name) for role in roles])
+        return entity_id
+
+    @staticmethod
+    @atomic(settings.CONNECTION_NAME)
+    async def _set_scope_roles(entity_id: EntityId, dto: ScopeConstructor.UpdateDto) -> tuple[EnableScope, list[Role]]:
         enable_scope = await EnableScope.get_or_none(id=entity_id).prefetch_related("scopes")
         if enable_scope is None:
             raise InconsistencyError(message=f"Scope with id={entity_id} doesn't exist.")
@@ -244,14 +261,7 @@ class ScopeConstructorAccess(BaseAccess):
 
         await enable_scope.scopes.clear()
         await enable_scope.scopes.add(*roles)
-
-        # Sending signal to update scopes in controller
-        await request.app.dispatch(
-            "controller.enabled_scopes.changed",
-            context={"enable_scope_name": enable_scope.name,
-                     "scopes": [scope.name for scope in await enable_scope.scopes.all()]}
-        )
-        return entity_id
+        return enable_scope, roles
 
     @atomic(settings.CONNECTION_NAME)
     async def delete(self, system_user: SystemUser, entity_id: EntityId) -> EntityId:
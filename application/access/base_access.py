@@ -1,7 +1,8 @@
-from typing import List, Type, Union
+from typing import Any, Iterable, List, Mapping, Type, Union
 
 from pydantic import BaseModel
 from tortoise.exceptions import IntegrityError
+from tortoise.queryset import QuerySet
 from tortoise.transactions import atomic
 
 import settings
@@ -9,7 +10,11 @@ from core.dto.access import EntityId
 from core.utils.error_format import integrity_error_format
 from infrastructure.database.layer import DbLayer
 from infrastructure.database.models import MODEL, AbstractBaseModel, SystemUser
+from infrastructure.database.pool import replica_read
+from infrastructure.database.relations import (Loading, RelationMeta,
+                                               plan_relations)
 from infrastructure.database.repository import EntityRepository
+from infrastructure.database.serializer import ModelSerializer
 
 
 class BaseAccess:
@@ -27,16 +32,54 @@ class BaseAccess:
             integrity_error_format(exception)
         return entity
 
-    async def read(self, _id: EntityId) -> MODEL:
-        related_fields = await DbLayer.extract_relatable_fields(self.target_model)
-        return await self.target_model.get_or_none(id=_id).prefetch_related(*related_fields)
+    @replica_read
+    async def read(self, _id: EntityId, fields: Iterable[str] | None = None,
+                   relations: Iterable[str] | None = None,
+                   overrides: Mapping[str, Loading] | None = None) -> MODEL:
+        """
+        relations default to the to-one ones, joined into the same query.
+        To-many relations of a detail are bounded by the serializer and loaded there.
+        """
+        if relations is None:
+            relations = RelationMeta.for_model(self.target_model).to_one
+        plan = plan_relations(self.target_model, relations, overrides, self._columns(fields))
+        entity = await plan.apply(self.query_all(fields)).filter(id=_id).first()
+        if entity is not None:
+            await plan.load([entity])
+        return entity
 
+    @replica_read
     async def read_all(self,
                        limit: int = 0,
-                       offset: int = 0) -> list[MODEL] | MODEL:
-        related_fields = await DbLayer.extract_relatable_fields(self.target_model)
-        query = self.target_model.all().prefetch_related(*related_fields)
-        return await query.limit(limit).offset(offset)
+                       offset: int = 0,
+                       fields: Iterable[str] | None = None,
+                       relations: Iterable[str] = (),
+                       overrides: Mapping[str, Loading] | None = None) -> list[MODEL] | MODEL:
+        """Relations of the page are joined or prefetched by plan_relations(), the rest is up to the serializer."""
+        plan = plan_relations(self.target_model, relations, overrides, self._columns(fields))
+        entities = await plan.apply(self.query_all(fields)).limit(limit).offset(offset)
+        await plan.load(entities)
+        return entities
+
+    @replica_read
+    async def read_all_records(self,
+                               limit: int = 0,
+                               offset: int = 0,
+                               fields: Iterable[str] | None = None) -> list[Mapping[str, Any]]:
+        """read_all() without model instances, rows go to ModelSerializer.dump_records()."""
+        columns = ModelSerializer.for_model(self.target_model).columns(fields)
+        return await DbLayer.fetch_records(self.target_model, columns, limit, offset)
+
+    def query_all(self, fields: Iterable[str] | None = None) -> QuerySet[MODEL]:
+        """Blob columns are selected only when listed in fields."""
+        fields = self._columns(fields)
+        query = self.target_model.all()
+        if fields:
+            query = query.only(*fields)
+        return query
+
+    def _columns(self, fields: Iterable[str] | None) -> Iterable[str] | None:
+        return fields or ModelSerializer.for_model(self.target_model).default_columns
 
     @atomic(settings.CONNECTION_NAME)
     async def update(self, system_user: SystemUser, entity_id: EntityId, dto: BaseModel) -> EntityId:
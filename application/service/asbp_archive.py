@@ -9,24 +9,41 @@ from tortoise.transactions import atomic
 import settings
 from core.dto.access import EntityId
 from core.server.auth import protect
+from core.utils.conditional import entity_validators, page_validators
 from core.utils.limit_offset import get_limit_offset
 from core.utils.loggining import logger
 from infrastructure.asbp_archive.models import Archive
 from infrastructure.database.models import Pass, SystemUser, Visitor
+from infrastructure.database.pool import Workload, in_replica, workload
+from infrastructure.database.serializer import dump_models
 
 
 class ArchiveController(HTTPMethodView):
     enabled_scopes = ["root", "Администратор"]
+    # Archiving itself runs as long as it takes
+    statement_timeout = {"GET": settings.LIST_STATEMENT_TIMEOUT}
 
     @protect(retrive_user=False)
     async def get(self, request: Request, entity: EntityId = None) -> HTTPResponse:
+        async with in_replica(settings.CONNECTION_NAME_ARCHIVE):
+            return await self.browse(request, entity)
+
+    @staticmethod
+    async def browse(request: Request, entity: EntityId = None) -> HTTPResponse:
         if entity is None:
             limit, offset = await get_limit_offset(request)
-            query = Archive.all().limit(limit).offset(offset)
-            return json([await model.values_dict() for model in await query])
+            models = await Archive.all().limit(limit).offset(offset)
+            validators = page_validators(request, Archive, models)
+            if validators and validators.matches(request):
+                return validators.not_modified()
+            return json(await dump_models(models), headers=validators and validators.headers)
 
+        if (validators := await entity_validators(request, Archive, entity)) is None:
+            raise NotFound()
+        if validators.matches(request):
+            return validators.not_modified()
         if model := await Archive.get_or_none(id=entity):
-            return json(await model.values_dict())
+            return json(await model.values_dict(), headers=validators.headers)
         else:
             raise NotFound()
 
@@ -39,6 +56,7 @@ class ArchiveController(HTTPMethodView):
         return json({"message": "No data to archive."})
 
     @staticmethod
+    @workload(Workload.BULK)
     async def do_archive() -> bool:
         """
         Collect appropriate data from main DB and transfer it to Archive DB, if needed.
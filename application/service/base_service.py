@@ -1,17 +1,22 @@
-from typing import Type
+from typing import Any, Iterable, Mapping, Type
 
 from pydantic import BaseModel
 from pyee.asyncio import AsyncIOEventEmitter
 from tortoise.exceptions import IntegrityError
+from tortoise.queryset import QuerySet
 from tortoise.transactions import atomic
 
 import settings
 from core.communication.publisher import Publisher
 from core.dto.access import EntityId
 from core.utils.error_format import integrity_error_format
-from infrastructure.database.layer import DbLayer
+from infrastructure.database.layer import BlobState, DbLayer
 from infrastructure.database.models import MODEL, SystemUser
+from infrastructure.database.pool import replica_read
+from infrastructure.database.relations import (Loading, RelationMeta,
+                                               plan_relations)
 from infrastructure.database.repository import EntityRepository
+from infrastructure.database.serializer import ModelSerializer
 
 
 class BaseService(Publisher):
@@ -33,16 +38,61 @@ class BaseService(Publisher):
             integrity_error_format(exception)
         return entity  # noqa
 
-    async def read(self, _id: EntityId) -> Type[MODEL] | None:
-        related_fields = await DbLayer.extract_relatable_fields(self.target_model)
-        return await self.target_model.get_or_none(id=_id).prefetch_related(*related_fields)
+    @replica_read
+    async def read(self, _id: EntityId, fields: Iterable[str] | None = None,
+                   relations: Iterable[str] | None = None,
+                   overrides: Mapping[str, Loading] | None = None) -> Type[MODEL] | None:
+        """
+        relations default to the to-one ones, joined into the same query.
+        To-many relations of a detail are bounded by the serializer and loaded there.
+        """
+        if relations is None:
+            relations = RelationMeta.for_model(self.target_model).to_one
+        plan = plan_relations(self.target_model, relations, overrides, self._columns(fields))
+        entity = await plan.apply(self.query_all(fields)).filter(id=_id).first()
+        if entity is not None:
+            await plan.load([entity])
+        return entity
 
+    @replica_read
     async def read_all(self,
                        limit: int = 0,
-                       offset: int = 0) -> list[MODEL]:
-        related_fields = await DbLayer.extract_relatable_fields(self.target_model)
-        query = self.target_model.all().prefetch_related(*related_fields)
-        return await query.limit(limit).offset(offset)
+                       offset: int = 0,
+                       fields: Iterable[str] | None = None,
+                       relations: Iterable[str] = (),
+                       overrides: Mapping[str, Loading] | None = None) -> list[MODEL]:
+        """Relations of the page are joined or prefetched by plan_relations(), the rest is up to the serializer."""
+        plan = plan_relations(self.target_model, relations, overrides, self._columns(fields))
+        entities = await plan.apply(self.query_all(fields)).limit(limit).offset(offset)
+        await plan.load(entities)
+        return entities
+
+    @replica_read
+    async def read_all_records(self,
+                               limit: int = 0,
+                               offset: int = 0,
+                               fields: Iterable[str] | None = None) -> list[Mapping[str, Any]]:
+        """read_all() without model instances, rows go to ModelSerializer.dump_records()."""
+        columns = ModelSerializer.for_model(self.target_model).columns(fields)
+        return await DbLayer.fetch_records(self.target_model, columns, limit, offset)
+
+    async def image_state(self, _id: EntityId, field: str) -> BlobState | None:
+        """Validators, size and content type of a blob column of the image endpoints without reading it."""
+        return await DbLayer.blob_state(self.target_model, _id, field)
+
+    async def read_image(self, _id: EntityId, field: str, start: int, length: int) -> bytes | None:
+        return await DbLayer.read_blob(self.target_model, _id, field, start, length)
+
+    def query_all(self, fields: Iterable[str] | None = None) -> QuerySet[MODEL]:
+        """Blob columns are selected only when listed in fields."""
+        fields = self._columns(fields)
+        query = self.target_model.all()
+        if fields:
+            query = query.only(*fields)
+        return query
+
+    def _columns(self, fields: Iterable[str] | None) -> Iterable[str] | None:
+        return fields or ModelSerializer.for_model(self.target_model).default_columns
 
     @atomic(settings.CONNECTION_NAME)
     async def delete(self, system_user: SystemUser, entity_id: EntityId) -> EntityId:
@@ -12,6 +12,7 @@ from core.dto.service import BlackListDto, EmailStruct, WebPush
 from infrastructure.database.models import (AbstractBaseModel, BlackList,
                                             PushSubscription, SystemUser,
                                             Visitor)
+from infrastructure.database.prepared import BLACKLIST_EXISTS
 
 
 class BlackListService(BaseService):
@@ -32,7 +33,7 @@ class BlackListService(BaseService):
         if visitor is None:
             raise InconsistencyError(message=f"Visitor with id={dto.visitor} does not exist."
                                              "You should provide valid Visitor for BlackList")
-        if await BlackList.exists(visitor=visitor.id):
+        if await BLACKLIST_EXISTS.fetch(visitor.id):
             raise InconsistencyError(message=f"Visitor with id={dto.visitor} already in BlackList.")
 
         kwrgs = {field: value for field, value in dto.dict().items() if field != "visitor"}
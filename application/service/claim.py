@@ -21,10 +21,23 @@ from core.dto.access import EntityId
 from core.dto.service import (ClaimDto, ClaimStatus, EmailStruct, VisitorDto,
                               WebPush)
 from core.plugins.plugins_wrap import AddPlugins
+from core.utils.executors import ExecutorRegistry
 from infrastructure.database.models import (BlackList, Claim, ClaimWay,
                                             ClaimWayApproval, Pass,
                                             PushSubscription, SystemUser,
                                             Visitor)
+from infrastructure.database.pool import Workload, workload
+
+
+def read_excel_sheets(excel_file: str) -> list[pd.DataFrame]:
+    """Parsing every sheet of base64 encoded excel file. Runs in ExecutorRegistry.EXCEL process pool."""
+    with pd.ExcelFile(BytesIO(base64.b64decode(excel_file))) as xls:
+        return [pd.read_excel(xls, sheet, dtype={"ФИО": str,
+                                                 "Телефон": str,
+                                                 "Почта": str,
+                                                 "Название компании": str,
+                                                 "Время визита": str})
+                for sheet in xls.sheet_names]
 
 
 class ClaimService(BaseService):
@@ -155,7 +168,7 @@ class ClaimService(BaseService):
     @atomic(settings.CONNECTION_NAME)
     async def update(self, system_user: SystemUser, entity_id: EntityId, dto: ClaimDto.UpdateDto) -> Claim:
         notification_counter = 0
-        claim: Claim = await self.read(entity_id)
+        claim: Claim = await Claim.get_or_none(id=entity_id).prefetch_related("claim_way", "claim_way_2")
         if claim is None:
             raise InconsistencyError(message=f"Claim with id={entity_id} does not exist.")
 
@@ -303,28 +316,22 @@ class ClaimService(BaseService):
             setattr(claim, "approved", False)
         await claim.save()
 
+    @workload(Workload.BULK)
     @atomic(settings.CONNECTION_NAME)
     async def upload_excel(self, system_user: SystemUser, dto: ClaimDto.GroupVisitDto) -> dict[str, str]:
         """Uploading excel file in xls/xlsx/xlsm/xltx/xltm formats."""
-        file_contents = base64.b64decode(dto.excel_file)
-        file_io = BytesIO(file_contents)
+        sheets = await ExecutorRegistry.run(ExecutorRegistry.EXCEL, read_excel_sheets, dto.excel_file)
         visitors = list()
-        with pd.ExcelFile(file_io) as xls:
-            for sheet in xls.sheet_names:
-                to_dto = await self.work_with_sheet(xls, sheet)
-                for visitor in to_dto:
-                    if visitor_dto := await self.check_visitor_dto(visitor):
-                        visitor_to_model = await self.create_visitor(visitor_dto)
-                        visitors.append(visitor_to_model)
+        for data_frame in sheets:
+            to_dto = await self.work_with_sheet(data_frame)
+            for visitor in to_dto:
+                if visitor_dto := await self.check_visitor_dto(visitor):
+                    visitor_to_model = await self.create_visitor(visitor_dto)
+                    visitors.append(visitor_to_model)
         return {"message": f"Visitors with id={[visitor.id for visitor in visitors]} were successfully created."}
 
-    async def work_with_sheet(self, xls: pd.ExcelFile, sheet: str) -> tuple[tuple, ...]:
+    async def work_with_sheet(self, data_frame: pd.DataFrame) -> tuple[tuple, ...]:
         """Collecting values from each column and save it to tuples."""
-        data_frame = pd.read_excel(xls, sheet, dtype={"ФИО": str,
-                                                      "Телефон": str,
-                                                      "Почта": str,
-                                                      "Название компании": str,
-                                                      "Время визита": str})
         fio = phone = email = company_name = visit_start_date = tuple()
         for column, values in data_frame.items():
             match column:
@@ -7,6 +7,7 @@ from application.exceptions import InconsistencyError
 from application.service.asbp_archive import ArchiveController
 from application.service.web_push import WebPushController
 from core.server.controllers import BaseAccessController
+from core.server.permissions import PermissionMatrix
 from core.server.routes import BaseServiceController
 from core.server.sse_monitoring import (StrangerThingsController,
                                         StrangerThingsEventsController)
@@ -38,19 +39,19 @@ async def init_scopes(app: Sanic) -> None:
 class EnabledScopeSetter:
     """
     After reloading Server
-    sets cls.enabled_scopes in Controllers
-    to appropriate scope from EnableScope.
+    binds Controllers to their routes in already loaded PermissionMatrix,
+    cls.enabled_scopes is set to appropriate scope from EnableScope.
     "root" & "Администратор" will be set for all controllers.
     """
 
     async def set_en_sc(self):
         for controller in BaseAccessController.__subclasses__():
             if controller.entity_name not in ("set-scopes", "set-scopes/<entity:int>"):
-                await self.set_scopes(controller.entity_name, controller)
+                self.set_scopes(controller.entity_name, controller)
 
         for controller in BaseServiceController.__subclasses__():
             if controller.target_route not in ("/auth", "/system-settings"):
-                await self.set_scopes(controller.target_route[1:], controller)
+                self.set_scopes(controller.target_route[1:], controller)
 
         controllers = {
             StrangerThingsEventsController: ("stranger-things-sse",),
@@ -61,18 +62,11 @@ class EnabledScopeSetter:
         }
         for controller, routes in controllers.items():
             for route in routes:
-                await self.set_scopes(route, controller)
+                self.set_scopes(route, controller)
 
     @staticmethod
-    async def set_scopes(name: str, controller: C) -> None:
-        en_sc = await EnableScope.get_or_none(name=name).prefetch_related("scopes")
-        if en_sc is None:
+    def set_scopes(name: str, controller: C) -> None:
+        if not PermissionMatrix.has_route(name):
             raise InconsistencyError(message=f"There is no scope with name: {name}")
-            # TODO remove creation in prod
-            # en_sc = await EnableScope.create(name=name)
-        enable_scopes = await en_sc.scopes.all()
-        setattr(
-            controller,
-            "enabled_scopes",
-            list(set([scope.name for scope in enable_scopes] + ["root", "Администратор"]))
-        )
+        setattr(controller, "permission_route", name)
+        setattr(controller, "enabled_scopes", PermissionMatrix.route_roles(name))
@@ -27,7 +27,8 @@ from core.dto.service import (DriveLicenseDto, EmailStruct,
                               VisitorPhotoDto, VisitSessionDto, WaterMarkDto,
                               WebPush)
 from core.plugins.plugins_wrap import AddPlugins
-from infrastructure.database.models import (MODEL, BlackList, Claim, ClaimWay,
+from core.utils.executors import ExecutorRegistry
+from infrastructure.database.models import (MODEL, Claim, ClaimWay,
                                             DriveLicense,
                                             InternationalPassport, MilitaryId,
                                             Pass, Passport, PushSubscription,
@@ -35,6 +36,8 @@ from infrastructure.database.models import (MODEL, BlackList, Claim, ClaimWay,
                                             Transport, Visitor, VisitorPhoto,
                                             VisitSession, WaterMark,
                                             WatermarkPosition)
+from infrastructure.database.pool import replica_read
+from infrastructure.database.prepared import BLACKLIST_EXISTS, PASS_RFID_EXISTS
 from infrastructure.database.repository import EntityRepository
 
 
@@ -115,7 +118,7 @@ class VisitorService(BaseService):
                                            visit_start_date=visit_start_date,
                                            visit_end_date=visit_end_date)
 
-            visitor_in_black_list = await BlackList.exists(visitor=visitor)
+            visitor_in_black_list = await BLACKLIST_EXISTS.fetch(visitor.id)
             if visitor_in_black_list:
                 self.notify(NotifyVisitorInBlackListEvent(await self.collect_target_users(visitor, user=system_user)))
 
@@ -137,7 +140,7 @@ class VisitorService(BaseService):
         if visitor is None:
             raise InconsistencyError(message=f"Visitor with id={entity_id} does not exist.")
 
-        visitor_in_black_list = await BlackList.exists(visitor=visitor)
+        visitor_in_black_list = await BLACKLIST_EXISTS.fetch(visitor.id)
         if visitor_in_black_list:
             self.notify(
                 NotifyVisitorInBlackListEvent(await self.collect_target_users(visitor, user=system_user)))
@@ -223,6 +226,7 @@ class VisitorService(BaseService):
             await StrangerThings.create(system_user=system_user, pass_to_black_list=dct)
 
     @staticmethod
+    @replica_read
     async def get_info_about_current_visit(entity_id: EntityId) -> dict[str, dict | list[dict] | str | None]:
         """Return info about visitor's visit"""
         visitor: Visitor = await Visitor.get_or_none(id=entity_id).prefetch_related("visit_session")
@@ -474,13 +478,33 @@ class VisitorPhotoService(BaseService):
                     setattr(dto, field, False)
 
 
+def render_qr_code(data: str) -> str:
+    """Runs in ExecutorRegistry.IMAGES process pool."""
+    qr = qrcode.QRCode()
+    qr.add_data(data)
+    qr.make(fit=True)
+    qr = qr.make_image(fill_color="black", back_color="white")  # qrcode.image.pil.PilImage
+    qr.save(buffered := BytesIO())
+    image = str(base64.b64encode(buffered.getvalue()))
+    buffered.close()
+    return image
+
+
+def render_barcode(data: str) -> str:
+    """Runs in ExecutorRegistry.IMAGES process pool."""
+    Code128(data, writer=SVGWriter()).write(buffered := BytesIO())
+    bar_code = str(base64.b64encode(buffered.getvalue()))
+    buffered.close()
+    return bar_code
+
+
 class PassService(BaseService):
     target_model = Pass
     rfid = itertools.count(1)
 
     async def generate_rfid(self) -> int:
         rfid = self.rfid.__next__()
-        while await Pass.exists(rfid=rfid):
+        while await PASS_RFID_EXISTS.fetch(str(rfid)):
             rfid += 1
         self.rfid = itertools.count(rfid + 1)
         return rfid
@@ -530,14 +554,7 @@ class PassService(BaseService):
         pass_id = await Pass.get_or_none(id=entity).only("rfid")
         if pass_id.rfid is None:
             raise InconsistencyError(message="To create qrcode RFID couldn't be NULL.")
-        qr = qrcode.QRCode()
-        qr.add_data(pass_id.rfid)
-        qr.make(fit=True)
-        qr = qr.make_image(fill_color="black", back_color="white")  # qrcode.image.pil.PilImage
-        qr.save(buffered := BytesIO())
-        image = str(base64.b64encode(buffered.getvalue()))
-        buffered.close()
-        return image
+        return await ExecutorRegistry.run(ExecutorRegistry.IMAGES, render_qr_code, pass_id.rfid)
 
     @atomic(settings.CONNECTION_NAME)
     async def create_barcode(self, system_user: SystemUser, entity: EntityId) -> str:
@@ -545,10 +562,7 @@ class PassService(BaseService):
         pass_id = await Pass.get_or_none(id=entity).only("rfid")
         if pass_id.rfid is None:
             raise InconsistencyError(message="To create barcode RFID couldn't be NULL.")
-        Code128(pass_id.rfid, writer=SVGWriter()).write(buffered := BytesIO())
-        bar_code = str(base64.b64encode(buffered.getvalue()))
-        buffered.close()
-        return bar_code
+        return await ExecutorRegistry.run(ExecutorRegistry.IMAGES, render_barcode, pass_id.rfid)
 
 
 class TransportService(BaseService):
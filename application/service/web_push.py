@@ -1,3 +1,5 @@
+import asyncio
+
 from pywebpush import WebPushException, webpush
 from sanic import HTTPResponse, Request, Sanic, json
 from sanic.exceptions import NotFound
@@ -11,10 +13,12 @@ from core.dto.access import EntityId
 from core.dto.service import WebPush
 from core.dto.validator import validate
 from core.server.auth import protect
+from core.utils.executors import ExecutorRegistry
 from core.utils.limit_offset import get_limit_offset
 from core.utils.loggining import logger
 from core.utils.orjson_default import odumps
 from infrastructure.database.models import PushSubscription, SystemUser
+from infrastructure.database.serializer import dump_models
 
 
 class WebPushController:
@@ -27,7 +31,7 @@ class WebPushController:
             if entity is None:
                 limit, offset = await get_limit_offset(request)
                 models = PushSubscription.all().limit(limit).offset(offset)
-                return json([await model.values_dict() for model in await models])
+                return json(await dump_models(await models))
 
             if model := await PushSubscription.get_or_none(id=entity):
                 return json(await model.values_dict(fk_fields=True))
@@ -100,7 +104,10 @@ class WebPushController:
     async def trigger_push_notification(sub: PushSubscription, title: str, body: str, url: str = "None") -> bool:
         """Send Push notification using pywebpush."""
         try:
-            response = webpush(
+            # pywebpush is built on blocking requests
+            response = await ExecutorRegistry.run(
+                ExecutorRegistry.BLOCKING_IO,
+                webpush,
                 subscription_info=sub.subscription_info,
                 data=odumps({"title": title, "body": body, "url": url}),
                 vapid_private_key=settings.VAPID_PRIVATE_KEY,
@@ -119,8 +126,10 @@ class WebPushController:
         """
         Loop through all subscriptions and send all the clients a push notification.
         """
-        return [await WebPushController.trigger_push_notification(subscription, title, body, url)
-                for subscription in subscriptions]
+        return list(await asyncio.gather(
+            *[WebPushController.trigger_push_notification(subscription, title, body, url)
+              for subscription in subscriptions]
+        ))
 
 
 def init_web_push(app: Sanic) -> None:
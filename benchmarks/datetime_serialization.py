@@ -0,0 +1,104 @@
+"""
+odumps() time on datetime heavy payloads: VisitSession, ParkingTimeslot and Claim lists.
+Compares the old default() hook, the cached DatetimeFormatter and ISO 8601 output
+(X-Datetime-Format: iso), which orjson writes natively.
+
+    python -m benchmarks.datetime_serialization --rows 10000
+
+Database is an in-memory SQLite, rows are serialized the same way list endpoints do it.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+from datetime import timedelta
+from functools import partial
+from time import perf_counter
+
+import orjson
+from tortoise import Tortoise
+
+import settings
+from core.utils.orjson_default import ISO_DATETIMES, odumps
+from infrastructure.database.models import (Claim, Parking, ParkingPlace,
+                                            ParkingTimeslot, SystemUser,
+                                            Transport, Visitor, VisitSession)
+from infrastructure.database.serializer import dump_models
+
+
+def legacy_default(obj):
+    """orjson_default.default as it was before DatetimeFormatter, kept here as the baseline."""
+    if hasattr(obj, "__json__"):
+        return json.loads(obj.__json__())
+    if isinstance(obj, datetime.datetime):
+        return obj.astimezone().strftime(settings.DATETIME_FORMAT)
+    if isinstance(obj, datetime.date):
+        return obj.strftime(settings.DATE_FORMAT)
+    raise TypeError
+
+
+legacy_odumps = partial(orjson.dumps, option=orjson.OPT_PASSTHROUGH_DATETIME, default=legacy_default)
+
+
+def iso_odumps(obj) -> bytes:
+    token = ISO_DATETIMES.set(True)
+    try:
+        return odumps(obj)
+    finally:
+        ISO_DATETIMES.reset(token)
+
+
+async def seed(rows: int) -> None:
+    started = datetime.datetime.now().astimezone()
+    user = await SystemUser.create(username="bench", password="x", salt="x", first_name="Bench", last_name="User")
+    visitor = await Visitor.create(first_name="Bench", last_name="Visitor", user=user)
+    transport = await Transport.create(model="bench", number="A000000")
+    parking = await Parking.create(name="bench", max_places=1)
+    place = await ParkingPlace.create(real_number=1, parking=parking)
+    await VisitSession.bulk_create([
+        VisitSession(visitor=visitor, enter=started + timedelta(minutes=i), exit=started + timedelta(minutes=i, hours=2))
+        for i in range(rows)
+    ], batch_size=1000)
+    await ParkingTimeslot.bulk_create([
+        ParkingTimeslot(parking_place=place, transport=transport,
+                        start=started + timedelta(hours=i), end=started + timedelta(hours=i + 1))
+        for i in range(rows)
+    ], batch_size=1000)
+    await Claim.bulk_create([
+        Claim(system_user=user, pass_type="разовый", status="действующая") for _ in range(rows)
+    ], batch_size=1000)
+
+
+def measure(name: str, rows: int, repeat: int, dumps, payload) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = perf_counter()
+        dumps(payload)
+        best = min(best, perf_counter() - started)
+    print(f"  {name:<18} {best * 1000:9.1f} ms  {rows / best:12.0f} rows/sec")
+    return best
+
+
+async def main(rows: int, repeat: int) -> None:
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"asbp": ["infrastructure.database.models"]})
+    await Tortoise.generate_schemas()
+    try:
+        await seed(rows)
+        for model in (VisitSession, ParkingTimeslot, Claim):
+            payload = await dump_models(await model.all())
+            assert odumps(payload) == legacy_odumps(payload)
+            print(f"{model.__name__} x{len(payload)}")
+            before = measure("default()", len(payload), repeat, legacy_odumps, payload)
+            after = measure("DatetimeFormatter", len(payload), repeat, odumps, payload)
+            iso = measure("ISO 8601", len(payload), repeat, iso_odumps, payload)
+            print(f"  speedup x{before / after:.1f}, iso x{before / iso:.1f}")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -1,10 +1,11 @@
 import inspect
 import json as main_json
 import re
+from hashlib import blake2b
 from typing import Dict
 
 from sanic import Request
-from sanic.response import json
+from sanic.response import empty, json
 from sanic_openapi import openapi3_blueprint, specification
 
 from core.server.controllers import BaseAccessController
@@ -68,7 +69,8 @@ class SanicRoutesFormatter:
                 methods.remove("PUT")
 
             elif "<entity:int>" in route.path:
-                methods.remove("POST")
+                if "POST" in methods:
+                    methods.remove("POST")
                 npath = path.replace("/<entity:int>", "")
                 entity_name = npath.split("/")[-1]
                 path = path.replace("entity", f"{entity_name}_id")
@@ -272,7 +274,13 @@ def overwrite_swagger_route(openapi_blueprint):
         swagger_js = specification.build().serialize()
         swagger_js['paths'] = SanicRoutesFormatter.format_swagger_paths(swagger_js['paths'])
 
-        return json(SanicRoutesFormatter.combine_paths(sanic_js, swagger_js))
+        response = json(SanicRoutesFormatter.combine_paths(sanic_js, swagger_js))
+        # Strong ETag lets the compression middleware cache the spec compressed
+        etag = f'"{blake2b(response.body, digest_size=16).hexdigest()}"'
+        if request.headers.get("if-none-match") == etag:
+            return empty(status=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return response
 
 
 if __name__ == '__main__':
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from orjson import loads
 from pydantic import BaseModel, DirectoryPath
 
@@ -16,12 +18,69 @@ class ReportConf(BaseModel):
 class StreamingConf(BaseModel):
     listen_timeout: float
     ping_timeout: float
+    chunk_size: int
+
+
+class NestedConf(BaseModel):
+    limit: int
+    relations: dict[str, int] = {}
+
+
+class CompressionConf(BaseModel):
+    min_size: int
+    gzip_level: int
+    brotli_quality: int
+    offload_size: int
+    cache_size: int
+    cache_entry_size: int
+
+
+class AuthCacheConf(BaseModel):
+    max_size: int
+    ttl: float
+    use_redis: bool
+
+
+class SessionStoreConf(BaseModel):
+    backend: Literal["db", "redis"]
+    flush_interval: float
+    purge_interval: float
+    # Seconds closed and expired sessions are kept for the audit trail before they are purged
+    retention: float = 90 * 24 * 3600
+
+
+class DbPoolConf(BaseModel):
+    minsize: int
+    maxsize: int
+    acquire_timeout: float | None = None
+    statement_cache_size: int = 100
+    max_inactive_connection_lifetime: float = 300
+    command_timeout: float | None = None
+    statement_timeout: float | None = None
+
+
+class ReplicaConf(BaseModel):
+    sticky_window: float
+
+
+class ExecutorConf(BaseModel):
+    name: str
+    kind: Literal["thread", "process"]
+    max_workers: int
+    max_concurrency: int
 
 
 class Config(BaseModel):
     some_conf: str
     redis: RedisConf
+    db_pools: dict[str, DbPoolConf]
+    replica: ReplicaConf
     streaming: StreamingConf
+    nested: NestedConf
+    compression: CompressionConf
+    auth_cache: AuthCacheConf
+    session_store: SessionStoreConf
+    executors: list[ExecutorConf]
     reports: list[ReportConf]
 
 
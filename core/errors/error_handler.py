@@ -1,5 +1,8 @@
+import asyncio
+
+from asyncpg import QueryCanceledError
 from sanic.errorpages import exception_response
-from sanic.exceptions import SanicException
+from sanic.exceptions import SanicException, ServiceUnavailable
 from sanic.handlers import ErrorHandler
 
 from application.exceptions import ApplicationError
@@ -19,6 +22,9 @@ class ExtendedErrorHandler(ErrorHandler):
                               "status_code": StatusCodes.APPLICATION_CODE})()
         else:
             self.log(request, exception)
+            # statement_timeout of the controller, acquire_timeout of the pool
+            if isinstance(exception, (QueryCanceledError, asyncio.TimeoutError)):
+                exception = ServiceUnavailable("Database is busy, try again later")
         fallback = request.app.config.FALLBACK_ERROR_FORMAT
         return exception_response(
             request,
@@ -1,7 +1,7 @@
 import json
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Dict, Tuple, Union
+from typing import Type, Union
 
 import pytz
 from sanic import HTTPResponse, Request, Sanic
@@ -13,21 +13,28 @@ import settings
 from core.dto import service, validate
 from core.errors.auth_errors import (AuthenticationFailed,
                                      MissingAuthorizationCookie, ScopesFailed)
-from core.utils.crypto import AESCrypto, BaseCrypto
-from infrastructure.database.models import (EnableScope, Role, SystemUser,
-                                            SystemUserSession)
-
-
-def generate_auth_resp(auth, session, token_data, scopes, username):
+from core.server.permissions import PermissionMatrix
+from core.server.revocation import RevocationList
+from core.server.session_cache import SessionCache, SessionPrincipal
+from core.server.session_store import BaseSessionStore, DbSessionStore
+from core.utils.crypto import AESCrypto, BaseCrypto, TokenSigner
+from core.utils.executors import ExecutorRegistry
+from infrastructure.database.layer import SystemUserDbLayer
+from infrastructure.database.models import SystemUser, SystemUserSession
+from infrastructure.database.prepared import SESSION_BY_ID, USER_WITH_SCOPES
+
+
+def generate_auth_resp(auth, session, token, scopes, username, scopes_version):
     expire = session.expire_time.strftime(auth.time_format)
     resp = json_response({
-        "token": token_data.cipher_text,
+        "token": token,
         "session": session.id,
         "expire_at": expire,
         "scopes": scopes,
+        "scopes_version": scopes_version,
         "username": username
     })
-    resp.cookies["token"] = token_data.cipher_text
+    resp.cookies["token"] = token
     resp.cookies["session"] = str(session.id)
     resp.cookies["expire_at"] = str(expire)
     return resp
@@ -40,15 +47,20 @@ class UserAuthController(HTTPMethodView):
         auth: Auth = request.app.ctx.auth
         user = await auth.get_user(dto.username, dto.password)
         payload = user.to_dict()
-        scopes = await self.get_routes_id(payload["scopes"])
-        token_data = await auth.generate_token(json.dumps(payload))
-        session = await auth.create_session(user, request.headers.get("user-agent"), token_data)
-        return generate_auth_resp(auth, session, token_data, scopes, dto.username)
+        scopes = PermissionMatrix.routes_ids(payload["scopes"])
+        session = await auth.create_session(user, request.headers.get("user-agent"))
+        token = await auth.generate_token(session)
+        return generate_auth_resp(auth, session, token, scopes, dto.username, PermissionMatrix.version())
 
-    async def get_routes_id(self, payload: list[str]):
-        scopes = [role.id for role in await Role.filter(name__in=payload)]
-        routes_id = [route.id for route in await EnableScope.filter(scopes__id__in=scopes).distinct()]
-        return routes_id
+    async def delete(self, request: Request) -> HTTPResponse:
+        """Logout: closing current session and dropping it from SessionCache."""
+        auth: Auth = request.app.ctx.auth
+        principal = await auth.validate_request(request, SystemUserSession)
+        await auth.close_session(principal)
+        resp = json_response({"message": "Successfully logged out."})
+        for cookie in ("token", "session", "expire_at"):
+            del resp.cookies[cookie]
+        return resp
 
 
 class CookiesStruct:
@@ -73,16 +85,27 @@ class CookiesStruct:
 
 class Auth:
     _crypto_algorithm: BaseCrypto
+    _token_signer: TokenSigner
+    _session_store: BaseSessionStore
     _default_expire_time: int
     _time_format = "%d-%m-%Y %H:%M:%S"
 
     def __init__(self, app: Sanic):
         self._crypto_algorithm = AESCrypto(app.config.FORWARDED_SECRET)
+        self._token_signer = TokenSigner(app.config.FORWARDED_SECRET)
+        self._session_store = DbSessionStore()
 
     @property
     def time_format(self):
         return self._time_format
 
+    @property
+    def session_store(self) -> BaseSessionStore:
+        return self._session_store
+
+    def use_session_store(self, store: BaseSessionStore) -> None:
+        self._session_store = store
+
     @property
     def algorithm(self):
         return self._crypto_algorithm
@@ -95,57 +118,103 @@ class Auth:
             raise AuthenticationFailed(f"Wrong password")
         return user
 
-    async def generate_token(self, payload: str) -> AESCrypto.DataStruct:
-        return self._crypto_algorithm.encrypt(payload)
+    async def generate_token(self, session: SystemUserSession) -> str:
+        """Issuing v2 token: the only thing it carries is who and until when."""
+        exp = None if session.expire_time == datetime.max else session.expire_time.timestamp()
+        payload = json.dumps({"user_id": session.user_id, "exp": exp})
+        return self._token_signer.sign(payload, session.id)
 
     @atomic(settings.CONNECTION_NAME)
-    async def create_session(self, user: SystemUser, user_agent: str,
-                             aes_token_data: AESCrypto.DataStruct) -> SystemUserSession:
+    async def create_session(self, user: SystemUser, user_agent: str) -> SystemUserSession:
         if user.expire_session_delta == 0:
             expire_at = datetime.max
         else:
             expire_at = datetime.now().astimezone() + timedelta(seconds=user.expire_session_delta)
-        aes_token_data.encode()
-        session = await SystemUserSession.create(user=user,
-                                                 user_agent=user_agent,
-                                                 last_online=datetime.now().astimezone(),
-                                                 created_at=datetime.now().astimezone(),
-                                                 expire_time=expire_at,
-                                                 salt=aes_token_data.salt,
-                                                 nonce=aes_token_data.nonce,
-                                                 tag=aes_token_data.tag
-                                                 )
-
-        return session
+        return await self._session_store.create(user, user_agent, expire_at)
 
-    @atomic(settings.CONNECTION_NAME)
-    async def validate_request(self, request: Request, session_model: SystemUserSession) -> \
-            Tuple[SystemUserSession, Dict]:
+    async def validate_request(self, request: Request,
+                               session_model: Type[SystemUserSession]) -> SessionPrincipal:
         if not request.cookies:
             raise AuthenticationFailed("Can't find cookies")
         cok = CookiesStruct(request.cookies, self._time_format)
-        session = await session_model.get_or_none(id=cok.session)
-        if not session:
+        if RevocationList.is_revoked(cok.session):
+            raise AuthenticationFailed("Session is closed")
+        principal = await SessionCache.get(cok.session, cok.token)
+        if principal is None:
+            if TokenSigner.is_own_format(cok.token):
+                principal = await self._validate_token(cok)
+            else:
+                principal = await self._validate_session(cok, session_model)
+            await SessionCache.set(cok.token, principal)
+        if principal.expired:
+            await SessionCache.invalidate_session(principal.session_id)
+            raise AuthenticationFailed("Session expired")
+        self._session_store.touch(principal.session_id)
+        return principal
+
+    async def _validate_token(self, cok: CookiesStruct) -> SessionPrincipal:
+        """v2 token: stateless check, only SystemUser with scopes is read from DB."""
+        try:
+            session_id, payload_str = self._token_signer.verify(cok.token)
+        except ValueError:
+            raise AuthenticationFailed("Invalid token")
+        if session_id != cok.session:
+            raise AuthenticationFailed("Invalid token")
+        payload = json.loads(payload_str)
+        if payload["exp"] is None:
+            expire_time = datetime.max.replace(tzinfo=pytz.UTC)
+        else:
+            expire_time = datetime.fromtimestamp(payload["exp"], tz=pytz.UTC)
+        if expire_time <= datetime.now(tz=pytz.UTC):
+            raise AuthenticationFailed("Session expired")
+        if not await self._session_store.is_live(session_id):
             raise AuthenticationFailed("Session not found, or already expired")
-        if session.expire_time <= datetime.now(tz=pytz.UTC):
+        found = await USER_WITH_SCOPES.fetch(payload["user_id"])
+        if found is None or found[0].deleted:
+            raise AuthenticationFailed("User not found")
+        user, scopes = found
+        return SessionPrincipal.from_user(session_id, user, expire_time, scopes)
+
+    @atomic(settings.CONNECTION_NAME)
+    async def _validate_session(self, cok: CookiesStruct,
+                                session_model: Type[SystemUserSession]) -> SessionPrincipal:
+        """v1 token: AES key is derived with scrypt from salt stored in session row."""
+        session = await SESSION_BY_ID.fetch(cok.session)
+        if not session or session.salt is None:
+            raise AuthenticationFailed("Session not found, or already expired")
+        if session.expire_time <= datetime.now(tz=pytz.UTC) or session.logout_time is not None:
             raise AuthenticationFailed("Session expired")
         aes = AESCrypto.DataStruct(cok.token,
                                    session.salt,
                                    session.nonce,
                                    session.tag)
-        payload_str = self._crypto_algorithm.decrypt(aes)
-        payload = json.loads(payload_str)
-        user = await session.user.prefetch_related("scopes")
-        return user, payload
+        try:
+            await ExecutorRegistry.run(ExecutorRegistry.CRYPTO, self._crypto_algorithm.decrypt, aes)
+        except ValueError:
+            raise AuthenticationFailed("Invalid token")
+        if (found := await USER_WITH_SCOPES.fetch(session.user_id)) is None:
+            raise AuthenticationFailed("User not found")
+        user, scopes = found
+        return SessionPrincipal.from_user(session.id, user, session.expire_time, scopes)
+
+    @atomic(settings.CONNECTION_NAME)
+    async def close_session(self, principal: SessionPrincipal) -> None:
+        now = datetime.now().astimezone()
+        await self._session_store.close(principal.session_id, now)
+        await SystemUserDbLayer.update_last_logout(principal.user_id, now)
+        await RevocationList.revoke(principal.session_id, principal.expire_time)
+        await SessionCache.invalidate_session(principal.session_id)
 
     async def check_scopes(self, user_scopes: list[str], target_scopes: Union[list[str], str]) -> None:
-        if isinstance(target_scopes, list):
-            route_scope = set(target_scopes)
-        elif isinstance(target_scopes, str):
-            route_scope = {target_scopes}
-        else:
+        if isinstance(target_scopes, str):
+            target_scopes = (target_scopes,)
+        elif not isinstance(target_scopes, list):
             raise ScopesFailed("Permission denied")
-        if not len(route_scope.intersection(user_scopes)) > 0:
+        if not any(scope in target_scopes for scope in user_scopes):
+            raise ScopesFailed("Permission denied")
+
+    async def check_permission(self, user_scopes: list[str], route: str) -> None:
+        if not PermissionMatrix.is_allowed(user_scopes, route):
             raise ScopesFailed("Permission denied")
 
 
@@ -161,10 +230,15 @@ def protect(retrive_user: bool = True):
             cls = args[0]
             initial_args = args
             request = args[1]
-            user, _ = await request.app.ctx.auth.validate_request(request, SystemUserSession)
-            await request.app.ctx.auth.check_scopes([i.name for i in user.scopes], cls.enabled_scopes)
+            auth: Auth = request.app.ctx.auth
+            principal = await auth.validate_request(request, SystemUserSession)
+            # Controllers bound to EnableScope are checked with PermissionMatrix, the rest by their own list
+            if route := getattr(cls, "permission_route", None):
+                await auth.check_permission(principal.scopes, route)
+            else:
+                await auth.check_scopes(principal.scopes, cls.enabled_scopes)
             if retrive_user:
-                initial_args += (user,)
+                initial_args += (principal.user(),)
             return await method(*initial_args, **kwargs)
 
         return func
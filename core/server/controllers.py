@@ -1,4 +1,4 @@
-from typing import Type
+from typing import Mapping, Type
 
 from pydantic import BaseModel
 from sanic import Request
@@ -17,16 +17,30 @@ from core.dto import access, validate
 from core.dto.access import EntityId
 from core.dto.service import ScopeConstructor
 from core.server.auth import protect
+from core.utils.conditional import entity_validators, page_validators
+from core.utils.fieldsets import get_fieldset
+from core.utils.json_stream import stream_models, stream_records
 from core.utils.limit_offset import get_limit_offset
+from core.utils.pagination import KEYSET_ORDERING, is_keyset, keyset_page
+from infrastructure.database.loader import BatchLoader
+from infrastructure.database.relations import Loading
+from infrastructure.database.serializer import ModelSerializer, dump_models
 
 
 class BaseAccessController(HTTPMethodView):
     enabled_scopes: list[str] | str
+    permission_route: str | None = None
+    # Seconds, or seconds per HTTP method, for every statement of a request, see core.server.timeouts
+    statement_timeout: float | Mapping[str, float] | None = None
     entity_name: str
     identity_type: Type
     post_dto: Type[BaseModel]
     put_dto: Type[BaseModel]
     access_type: Type[BaseAccess]
+    # Lists without ?expand= are read as raw rows, without model instances
+    raw_rows: bool = False
+    # Per relation "join", "prefetch" or "skip" over the defaults of plan_relations()
+    relation_loading: Mapping[str, Loading] = {}
 
     @staticmethod
     def validate(dto_type: Type[BaseModel], request: Request) -> Type[BaseModel]:
@@ -34,14 +48,45 @@ class BaseAccessController(HTTPMethodView):
 
     @protect(retrive_user=False)
     async def get(self, request: Request, entity: EntityId = None) -> HTTPResponse:
+        access = request.app.ctx.access_registry.get(self.access_type)
+        fieldset = await get_fieldset(request, access.target_model,
+                                      required=KEYSET_ORDERING if is_keyset(request) else ())
         if entity is None:
             limit, offset = await get_limit_offset(request)
-            models = await request.app.ctx.access_registry.get(self.access_type).read_all(limit, offset)
-            return json([await model.values_dict() for model in models])
-
-        model = await request.app.ctx.access_registry.get(self.access_type).read(entity)
+            if is_keyset(request):
+                return await keyset_page(request, access.query_all(fieldset.columns), limit, expand=fieldset.expand)
+            if self.raw_rows and not fieldset.expand:
+                serializer = ModelSerializer.for_model(access.target_model)
+                if not limit and not offset:
+                    return await stream_records(request, access.target_model, serializer.columns(fieldset.columns))
+                records = await access.read_all_records(limit, offset, fields=fieldset.columns)
+                validators = page_validators(request, access.target_model, records)
+                if validators and validators.matches(request):
+                    return validators.not_modified()
+                return json(serializer.dump_records(records), headers=validators and validators.headers)
+            if not limit and not offset:
+                return await stream_models(request, access.query_all(fieldset.columns), expand=fieldset.expand)
+            models = await access.read_all(limit, offset, fields=fieldset.columns, relations=fieldset.expand or (),
+                                           overrides=self.relation_loading)
+            validators = None if fieldset.expand else page_validators(request, access.target_model, models)
+            if validators and validators.matches(request):
+                return validators.not_modified()
+            return json(await dump_models(models, loader=BatchLoader.for_request(request), expand=fieldset.expand),
+                        headers=validators and validators.headers)
+
+        # Validators cover own columns only, relations are dumped unless ?expand= is empty
+        validators = None
+        if fieldset.expand == ():
+            if (validators := await entity_validators(request, access.target_model, entity)) is None:
+                raise NotFound()
+            if validators.matches(request):
+                return validators.not_modified()
+        model = await access.read(entity, fields=fieldset.columns, relations=fieldset.expand,
+                                  overrides=self.relation_loading)
         if model:
-            return json(await model.values_dict(m2m_fields=True, fk_fields=True, o2o_fields=True))
+            return json(await model.values_dict(m2m_fields=True, fk_fields=True, o2o_fields=True,
+                                                loader=BatchLoader.for_request(request), expand=fieldset.expand),
+                        headers=validators and validators.headers)
         else:
             raise NotFound()
 
@@ -74,11 +119,11 @@ class ScopeConstructorController(BaseAccessController):
         if entity is None:
             limit, offset = await get_limit_offset(request)
             models = await request.app.ctx.access_registry.get(self.access_type).read_all(limit, offset)
-            return json([await model.values_dict(m2m_fields=True) for model in models])
+            return json(await dump_models(models, m2m_fields=True, loader=BatchLoader.for_request(request)))
 
         model = await request.app.ctx.access_registry.get(self.access_type).read(entity)
         if model:
-            return json(await model.values_dict(m2m_fields=True))
+            return json(await model.values_dict(m2m_fields=True, loader=BatchLoader.for_request(request)))
         else:
             raise NotFound()
 
@@ -99,6 +144,7 @@ class SystemUserController(BaseAccessController):
 
 class ZoneController(BaseAccessController):
     entity_name = 'zones'
+    raw_rows = True
     enabled_scopes = ["root", "Администратор"]
     identity_type = int
     post_dto = access.Zone.CreationDto
@@ -119,11 +165,12 @@ class ClaimWayController(BaseAccessController):
         if entity is None:
             limit, offset = await get_limit_offset(request)
             models = await request.app.ctx.access_registry.get(self.access_type).read_all(limit, offset)
-            return json([await model.values_dict(m2m_fields=True) for model in models])
+            return json(await dump_models(models, m2m_fields=True, loader=BatchLoader.for_request(request)))
 
         model = await request.app.ctx.access_registry.get(self.access_type).read(entity)
         if model:
-            return json(await model.values_dict(m2m_fields=True, fk_fields=True, o2o_fields=True))
+            return json(await model.values_dict(m2m_fields=True, fk_fields=True, o2o_fields=True,
+                                                loader=BatchLoader.for_request(request)))
         else:
             raise NotFound()
 
@@ -158,7 +205,7 @@ class ParkingPlaceBulkCreateDeleteController(BaseAccessController):
     async def post(self, request: Request, user: EntityId) -> HTTPResponse:
         dto = self.validate(self.post_dto, request)
         models = await request.app.ctx.access_registry.get(self.access_type).mass_create(user, dto)
-        return json({"parking_places": [await model.values_dict() for model in models]})
+        return json({"parking_places": await dump_models(models)})
 
     @protect()
     async def delete(self, request: Request, user: EntityId, entity: EntityId = None) -> HTTPResponse:
@@ -167,6 +214,7 @@ class ParkingPlaceBulkCreateDeleteController(BaseAccessController):
 
 class ParkingController(BaseAccessController):
     entity_name = 'parkings'
+    raw_rows = True
     enabled_scopes = ["root", "Администратор"]
     identity_type = int
     post_dto = access.Parking.CreationDto
@@ -185,6 +233,7 @@ class RoleController(BaseAccessController):
 
 class BuildingController(BaseAccessController):
     entity_name = 'buildings'
+    raw_rows = True
     enabled_scopes = ["root", "Администратор"]
     identity_type = int
     post_dto = access.BuildingDto.CreationDto
@@ -194,6 +243,7 @@ class BuildingController(BaseAccessController):
 
 class DivisionController(BaseAccessController):
     entity_name = 'divisions'
+    raw_rows = True
     enabled_scopes = ["root", "Администратор"]
     identity_type = int
     post_dto = access.DivisionDto.CreationDto
@@ -203,6 +253,7 @@ class DivisionController(BaseAccessController):
 
 class OrganisationController(BaseAccessController):
     entity_name = 'organisations'
+    raw_rows = True
     enabled_scopes = ["root", "Администратор"]
     identity_type = int
     post_dto = access.OrganisationDto.CreationDto
@@ -212,6 +263,7 @@ class OrganisationController(BaseAccessController):
 
 class JobTitleController(BaseAccessController):
     entity_name = 'job-titles'
+    raw_rows = True
     enabled_scopes = ["root", "Администратор"]
     identity_type = int
     post_dto = access.JobTitleDto.CreationDto
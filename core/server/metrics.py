@@ -0,0 +1,34 @@
+import os
+from pathlib import Path
+
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+from sanic import Sanic
+
+import settings
+from core.utils.loggining import logger
+
+
+def _worker_stopped(*_) -> None:
+    # Drops the live gauges of the worker, its counters and histograms stay in the totals
+    multiprocess.mark_process_dead(os.getpid())
+
+
+def init_metrics(app: Sanic) -> None:
+    """Clears samples of the previous run, called in the main process before any metric is written."""
+    if not settings.PROMETHEUS_MULTIPROC_DIR:
+        logger.warning("PROMETHEUS_MULTIPROC_DIR is not set, metrics are disabled")
+        return
+    directory = Path(settings.PROMETHEUS_MULTIPROC_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for stale in directory.glob("*.db"):
+        stale.unlink()
+    app.register_listener(_worker_stopped, "after_server_stop")
+
+
+def serve_metrics() -> None:
+    """Serves the metrics of all workers on METRICS_PORT, called in the main process right before the workers start."""
+    if not settings.PROMETHEUS_MULTIPROC_DIR or settings.METRICS_PORT is None:
+        return
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(settings.METRICS_PORT, addr=settings.METRICS_HOST, registry=registry)
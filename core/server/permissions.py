@@ -0,0 +1,158 @@
+import asyncio
+from typing import Iterable
+
+from aioredis import Redis
+from aioredis.client import PubSub
+from orjson import dumps, loads
+from sanic import Sanic
+
+import settings
+from core.utils.loggining import logger
+from infrastructure.database.models import EnableScope
+
+
+class PermissionMatrix:
+    """
+    Compiled Role x EnableScope index.
+    Every route keeps a bitmask of allowed roles (bit number is Role.id),
+    so a route check is an AND of user's roles mask and route's mask.
+    Loaded with one query at worker start, rebuilt per route after ScopeConstructorAccess.update().
+
+    Changes are broadcast to all workers and nodes over Redis pub/sub.
+    Every change gets the next version from a Redis counter; a worker which finds a gap
+    in versions (e.g. it was disconnected for a while) reloads the whole matrix from DB.
+    """
+    SUPERUSER_ROLES = frozenset(("root", "Администратор"))
+
+    _route_masks: dict[str, int] = {}
+    _route_ids: dict[str, int] = {}
+    _role_bits: dict[str, int] = {}
+    _role_names: dict[int, str] = {}
+    _version: int = 0
+    _app: Sanic | None = None
+    _redis: Redis | None = None
+
+    @classmethod
+    async def activate(cls, app: Sanic) -> None:
+        """Subscribing before loading, so no change committed after load is missed."""
+        cls._app = app
+        cls._redis = app.ctx.redis
+        pubsub = cls._redis.pubsub()
+        await pubsub.subscribe(settings.AUTHZ_EVENTS_KEY)
+        cls._version = int(await cls._redis.get(settings.AUTHZ_VERSION_KEY) or 0)
+        await cls.load()
+        app.add_task(cls._listen_changes(pubsub), name="authz_changes")
+
+    @classmethod
+    def version(cls) -> int:
+        return cls._version
+
+    @classmethod
+    async def load(cls) -> None:
+        rows = await EnableScope.all().values_list("id", "name", "scopes__id", "scopes__name")
+        route_masks, route_ids, role_names = {}, {}, {}
+        for route_id, route, role_id, role_name in rows:
+            route_ids[route] = route_id
+            route_masks.setdefault(route, 0)
+            if role_id is not None:
+                route_masks[route] |= 1 << role_id
+                role_names[role_id] = role_name
+        cls._route_masks, cls._route_ids, cls._role_names = route_masks, route_ids, role_names
+        cls._compile_role_bits()
+
+    @classmethod
+    def _compile_role_bits(cls) -> None:
+        role_bits = {}
+        for role_id, role_name in cls._role_names.items():
+            role_bits[role_name] = role_bits.get(role_name, 0) | 1 << role_id
+        cls._role_bits = role_bits
+
+    @classmethod
+    def update_route(cls, route_id: int, route: str, roles: Iterable[tuple[int, str]]) -> None:
+        """Incremental rebuild after roles of a single route were changed."""
+        mask = 0
+        for role_id, role_name in roles:
+            mask |= 1 << role_id
+            cls._role_names[role_id] = role_name
+        cls._route_ids[route] = route_id
+        cls._route_masks[route] = mask
+        cls._compile_role_bits()
+
+    @classmethod
+    async def publish_route(cls, route_id: int, route: str, roles: Iterable[tuple[int, str]]) -> None:
+        """Must be called after the transaction changing EnableScope is committed."""
+        await cls._publish({"route_id": route_id, "route": route, "roles": list(roles)})
+
+    @classmethod
+    async def publish_reload(cls) -> None:
+        """Roles themselves were changed, every worker reloads the matrix."""
+        await cls._publish({"reload": True})
+
+    @classmethod
+    async def _publish(cls, change: dict) -> None:
+        if cls._redis is None:
+            await cls._apply(change)
+            return
+        version = await cls._redis.incr(settings.AUTHZ_VERSION_KEY)
+        await cls._apply(change, version)
+        await cls._redis.publish(settings.AUTHZ_EVENTS_KEY, dumps({"version": version, **change}))
+
+    @classmethod
+    async def _apply(cls, change: dict, version: int | None = None) -> None:
+        if version is not None and version <= cls._version:
+            return
+        match change:
+            case {"route_id": route_id, "route": route, "roles": roles} \
+                    if version is None or version == cls._version + 1:
+                cls.update_route(route_id, route, roles)
+            case _:
+                route = None
+                await cls.load()
+        if version is not None:
+            cls._version = version
+        if cls._app is not None:
+            await cls._app.dispatch("controller.enabled_scopes.changed", context={"enable_scope_name": route})
+
+    @classmethod
+    async def _listen_changes(cls, pubsub: PubSub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                change = loads(message["data"])
+                await cls._apply(change, change.pop("version"))
+        except asyncio.CancelledError:
+            pass
+        except Exception as ex:
+            logger.warning(f"Authorization changes listener crashed: {ex}")
+        finally:
+            await pubsub.close()
+
+    @classmethod
+    def has_route(cls, route: str) -> bool:
+        return route in cls._route_masks
+
+    @classmethod
+    def roles_mask(cls, role_names: Iterable[str]) -> int:
+        mask = 0
+        for name in role_names:
+            mask |= cls._role_bits.get(name, 0)
+        return mask
+
+    @classmethod
+    def route_roles(cls, route: str) -> list[str]:
+        mask = cls._route_masks.get(route, 0)
+        names = {name for role_id, name in cls._role_names.items() if mask >> role_id & 1}
+        return list(names | cls.SUPERUSER_ROLES)
+
+    @classmethod
+    def is_allowed(cls, role_names: list[str], route: str) -> bool:
+        if not cls.SUPERUSER_ROLES.isdisjoint(role_names):
+            return True
+        return cls.roles_mask(role_names) & cls._route_masks.get(route, 0) != 0
+
+    @classmethod
+    def routes_ids(cls, role_names: list[str]) -> list[int]:
+        """EnableScope ids available for the roles, returned on login."""
+        mask = cls.roles_mask(role_names)
+        return [cls._route_ids[route] for route, route_mask in cls._route_masks.items() if route_mask & mask]
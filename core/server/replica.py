@@ -0,0 +1,40 @@
+from time import time
+
+from sanic import HTTPResponse, Request
+
+from config.config import ReplicaConf
+from infrastructure.database.pool import REPLICA_READS
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ReadYourWrites:
+    """
+    Read replica routing per request. GET requests read through the replica in read-only methods only
+    (see @replica_read), authentication, session bookkeeping and any write stay on the primary.
+    a client which has just written something reads from the primary for config.replica.sticky_window seconds,
+    so it does not miss its own changes while the replica catches up.
+    The window is kept in a cookie, it works whatever worker serves the next request.
+    """
+    COOKIE = "read_primary_until"
+    _window: float = 0
+
+    @classmethod
+    def activate(cls, conf: ReplicaConf) -> None:
+        cls._window = conf.sticky_window
+
+    @classmethod
+    async def route_reads(cls, request: Request) -> None:
+        """Request middleware, set on every request: keep-alive requests of a connection share the task."""
+        sticky_until = request.cookies.get(cls.COOKIE, "")
+        REPLICA_READS.set(request.method in SAFE_METHODS
+                          and not (sticky_until.isdigit() and int(sticky_until) > time()))
+
+    @classmethod
+    async def stick_to_primary(cls, request: Request, response: HTTPResponse) -> None:
+        """Response middleware, starts the window after a successful write."""
+        if request.method in SAFE_METHODS or response.status >= 400 or not cls._window:
+            return
+        response.cookies[cls.COOKIE] = str(int(time() + cls._window) + 1)
+        response.cookies[cls.COOKIE]["max-age"] = int(cls._window) + 1
+        response.cookies[cls.COOKIE]["httponly"] = True
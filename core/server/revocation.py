@@ -0,0 +1,64 @@
+import asyncio
+from datetime import datetime
+
+import pytz
+from aioredis import Redis
+from orjson import dumps, loads
+from sanic import Sanic
+
+import settings
+from core.utils.loggining import logger
+from infrastructure.database.models import SystemUserSession
+
+
+class RevocationList:
+    """
+    Sessions closed before their expire time.
+    v2 tokens are verified without reading SystemUserSession, so every worker keeps
+    this list in memory: seeded from DB on start and kept in sync over Redis pub/sub.
+    """
+    _revoked: dict[int, datetime] = {}
+    _redis: Redis | None = None
+
+    @classmethod
+    async def activate(cls, app: Sanic) -> None:
+        cls._redis = app.ctx.redis
+        now = datetime.now(tz=pytz.UTC)
+        rows = await SystemUserSession.filter(logout_time__isnull=False,
+                                              expire_time__gt=now).values_list("id", "expire_time")
+        cls._revoked = dict(rows)
+        app.add_task(cls._listen_revocations(), name="session_revocations")
+
+    @classmethod
+    def is_revoked(cls, session_id: int) -> bool:
+        expire_time = cls._revoked.get(session_id)
+        if expire_time is None:
+            return False
+        if expire_time <= datetime.now(tz=pytz.UTC):
+            # Token is expired anyway, no need to keep it here
+            del cls._revoked[session_id]
+        return True
+
+    @classmethod
+    async def revoke(cls, session_id: int, expire_time: datetime) -> None:
+        cls._revoked[session_id] = expire_time
+        if cls._redis is not None:
+            await cls._redis.publish(settings.SESSION_REVOKED_EVENTS_KEY,
+                                     dumps({"session": session_id, "expire_time": expire_time}))
+
+    @classmethod
+    async def _listen_revocations(cls) -> None:
+        pubsub = cls._redis.pubsub()
+        await pubsub.subscribe(settings.SESSION_REVOKED_EVENTS_KEY)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                data = loads(message["data"])
+                cls._revoked[data["session"]] = datetime.fromisoformat(data["expire_time"])
+        except asyncio.CancelledError:
+            pass
+        except Exception as ex:
+            logger.warning(f"Session revocation listener crashed: {ex}")
+        finally:
+            await pubsub.close()
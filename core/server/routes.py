@@ -1,9 +1,9 @@
-from typing import Type
+from typing import Any, Mapping, Type
 
 from pydantic import BaseModel
 from sanic import Request
 from sanic.exceptions import NotFound
-from sanic.response import HTTPResponse, json
+from sanic.response import HTTPResponse, empty, json, raw
 from sanic.views import HTTPMethodView
 
 import settings
@@ -27,7 +27,15 @@ from core.dto.service import (BlackListDto, ClaimDto, DriveLicenseDto,
                               SystemSettingsDto, TransportDto, VisitorDto,
                               VisitorPhotoDto, VisitSessionDto, WaterMarkDto)
 from core.server.auth import protect
+from core.utils.byte_range import parse_range
+from core.utils.conditional import Validators, entity_validators, page_validators
+from core.utils.fieldsets import get_fieldset
+from core.utils.json_stream import stream_models, stream_records
 from core.utils.limit_offset import get_limit_offset
+from core.utils.media import guess_content_type
+from core.utils.nested import bounded_relations, dump_entity
+from core.utils.pagination import (KEYSET_ORDERING, get_total, is_keyset,
+                                   keyset_page, read_after)
 from infrastructure.database.models import (MODEL, BlackList, Claim,
                                             ClaimWayApproval, DriveLicense,
                                             InternationalPassport, MilitaryId,
@@ -35,15 +43,26 @@ from infrastructure.database.models import (MODEL, BlackList, Claim,
                                             SystemSettings, SystemUser,
                                             Transport, Visitor, VisitorPhoto,
                                             VisitSession, WaterMark)
+from infrastructure.database.loader import BatchLoader
+from infrastructure.database.relations import (PREFETCH, Loading,
+                                               RelationMeta)
+from infrastructure.database.serializer import ModelSerializer, dump_models
 
 
 class BaseServiceController(HTTPMethodView):
     enabled_scopes: list[str] | str
+    permission_route: str | None = None
+    # Seconds, or seconds per HTTP method, for every statement of a request, see core.server.timeouts
+    statement_timeout: float | Mapping[str, float] | None = None
     target_route: str
     target_service: Type[BaseService]
     returned_model: Type[MODEL]
     post_dto: Type[BaseModel]
     put_dto: Type[BaseModel]
+    # Lists without ?expand= are read as raw rows, without model instances
+    raw_rows: bool = False
+    # Per relation "join", "prefetch" or "skip" over the defaults of plan_relations()
+    relation_loading: Mapping[str, Loading] = {}
 
     @staticmethod
     def validate(dto_type: BaseModel | Type[BaseModel], request: Request) -> Type[BaseModel]:
@@ -51,15 +70,45 @@ class BaseServiceController(HTTPMethodView):
 
     @protect(retrive_user=False)
     async def get(self, request: Request, entity: EntityId = None) -> HTTPResponse:
+        service = request.app.ctx.service_registry.get(self.target_service)
+        fieldset = await get_fieldset(request, service.target_model,
+                                      required=KEYSET_ORDERING if is_keyset(request) else ())
         if entity is None:
             limit, offset = await get_limit_offset(request)
-            models = await request.app.ctx.service_registry.get(self.target_service).read_all(limit, offset)
-            return json([await model.values_dict() for model in models])
-
-        model = await request.app.ctx.service_registry.get(self.target_service).read(entity)
+            if is_keyset(request):
+                return await keyset_page(request, service.query_all(fieldset.columns), limit, expand=fieldset.expand)
+            if self.raw_rows and not fieldset.expand:
+                serializer = ModelSerializer.for_model(service.target_model)
+                if not limit and not offset:
+                    return await stream_records(request, service.target_model, serializer.columns(fieldset.columns))
+                records = await service.read_all_records(limit, offset, fields=fieldset.columns)
+                validators = page_validators(request, service.target_model, records)
+                if validators and validators.matches(request):
+                    return validators.not_modified()
+                return json(serializer.dump_records(records), headers=validators and validators.headers)
+            if not limit and not offset:
+                return await stream_models(request, service.query_all(fieldset.columns), expand=fieldset.expand)
+            models = await service.read_all(limit, offset, fields=fieldset.columns, relations=fieldset.expand or (),
+                                            overrides=self.relation_loading)
+            validators = None if fieldset.expand else page_validators(request, service.target_model, models)
+            if validators and validators.matches(request):
+                return validators.not_modified()
+            return json(await dump_models(models, loader=BatchLoader.for_request(request), expand=fieldset.expand),
+                        headers=validators and validators.headers)
+
+        # Validators cover own columns only, relations are dumped unless ?expand= is empty
+        validators = None
+        if fieldset.expand == ():
+            if (validators := await entity_validators(request, service.target_model, entity)) is None:
+                raise NotFound()
+            if validators.matches(request):
+                return validators.not_modified()
+        model = await service.read(entity, fields=fieldset.columns, relations=fieldset.expand,
+                                   overrides=self.relation_loading)
         if model:
-            return json(await model.values_dict(m2m_fields=True, fk_fields=True,
-                                                o2o_fields=True, backward_fk_fields=True))
+            return json(await dump_entity(request, model, expand=fieldset.expand,
+                                          m2m_fields=True, fk_fields=True, o2o_fields=True, backward_fk_fields=True),
+                        headers=validators and validators.headers)
         else:
             raise NotFound()
 
@@ -84,28 +133,140 @@ class BaseServiceController(HTTPMethodView):
         return json(model)
 
 
+class _OwnerAttribute:
+    """Attribute of the owner controller, read on every access from the class and its instances."""
+    __slots__ = ("name",)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance: Any, cls: type) -> Any:
+        return getattr(cls.owner, self.name)
+
+
+class RelatedCollectionController(HTTPMethodView):
+    """
+    GET <detail route>/related/<relation>: backward relation of an entity page by page, ?after= and ?limit= as in lists.
+    Detail responses return the first config.nested rows of the relation and link here.
+    Registered for every detail route of BaseServiceController, access rules are those of the detail controller:
+    it is bound to its EnableScope and refreshed after the routes are registered.
+    """
+    owner: Type[BaseServiceController]
+    enabled_scopes = _OwnerAttribute()
+    permission_route = _OwnerAttribute()
+    statement_timeout = _OwnerAttribute()
+    target_service = _OwnerAttribute()
+
+    @classmethod
+    def for_owner(cls, owner: Type[BaseServiceController]) -> Type["RelatedCollectionController"]:
+        return type(f"{owner.__qualname__.replace('.', '')}Related", (cls,), {"owner": owner})
+
+    @protect(retrive_user=False)
+    async def get(self, request: Request, entity: EntityId, relation: str) -> HTTPResponse:
+        service = request.app.ctx.service_registry.get(self.target_service)
+        # Backward relations are known only after Tortoise.init(), so the name is checked per request
+        if relation not in bounded_relations(service.target_model):
+            raise NotFound()
+        field = service.target_model._meta.fields_map[relation]
+        to_field = field.to_field_instance.model_field_name
+        if (owner := await service.read(entity, fields=(to_field,))) is None:
+            raise NotFound()
+        query = field.related_model.filter(**{field.relation_field: getattr(owner, to_field)})
+        if columns := ModelSerializer.for_model(field.related_model).default_columns:
+            query = query.only(*columns)
+        limit, _ = await get_limit_offset(request)
+        models, next_cursor = await read_after(query, request.args.get("after"), limit)
+        return json({"items": await dump_models(models, loader=BatchLoader.for_request(request)),
+                     "next_cursor": next_cursor})
+
+
+class ImageRoute:
+    """
+    GET <detail route>/<field>: raw bytes of a blob column, images are excluded from JSON and served here.
+    Mixed into a BaseServiceController, Range requests are cut by the database.
+    """
+    target_service: Type[BaseService]
+
+    @protect(retrive_user=False)
+    async def get(self, request: Request, entity: EntityId, field: str) -> HTTPResponse:
+        service = request.app.ctx.service_registry.get(self.target_service)
+        if field not in ModelSerializer.for_model(service.target_model).bytes_fields:
+            raise NotFound()
+        if (state := await service.image_state(entity, field)) is None or state.size is None:
+            raise NotFound()
+
+        validators = Validators(request, service.target_model._meta.db_table, entity, field,
+                                last_modified=state.modified_at)
+        headers = {**validators.headers, "Accept-Ranges": "bytes"}
+        if validators.matches(request):
+            return empty(status=304, headers=headers)
+        try:
+            byte_range = parse_range(request.headers.get("range"), state.size)
+        except ValueError:
+            return empty(status=416, headers={"Content-Range": f"bytes */{state.size}"})
+        start, length = (0, state.size) if byte_range is None else (byte_range.start, byte_range.length)
+        data = await service.read_image(entity, field, start, length) if length else b""
+        if data is None:
+            raise NotFound()
+        content_type = guess_content_type(state.head or b"")
+        if byte_range is None:
+            return raw(data, content_type=content_type, headers=headers)
+        headers["Content-Range"] = byte_range.content_range(state.size)
+        return raw(data, status=206, content_type=content_type, headers=headers)
+
+    @protect()
+    async def post(self, request: Request, system_user: SystemUser) -> HTTPResponse:
+        raise InconsistencyError(message="POST request is prohibited for this route.")
+
+    @protect()
+    async def put(self, request: Request, system_user: SystemUser, entity: EntityId, field: str) -> HTTPResponse:
+        raise InconsistencyError(message="PUT request is prohibited for this route.")
+
+    @protect()
+    async def delete(self, request: Request, system_user: SystemUser, entity: EntityId, field: str) -> HTTPResponse:
+        raise InconsistencyError(message="DELETE request is prohibited for this route.")
+
+
 class ClaimController:
     returned_model = Claim
 
     class Create(BaseServiceController):
         enabled_scopes = ["root", "Администратор"]
+        statement_timeout = {"GET": settings.LIST_STATEMENT_TIMEOUT}
         target_route = "/claims"
         target_service = ClaimService
         post_dto = ClaimDto.CreationDto
+        # A handful of routes and users own most claims: on lists BatchLoader reads each of them once,
+        # a join would repeat them on every row
+        relation_loading = {"claim_way": PREFETCH, "claim_way_2": PREFETCH, "system_user": PREFETCH}
 
         @protect(retrive_user=False)
         async def get(self, request: Request, entity: EntityId = None) -> HTTPResponse:
+            service = request.app.ctx.service_registry.get(self.target_service)
+            # Every response carries the relations of the claims, they are sent without validators
             if entity is None:
                 limit, offset = await get_limit_offset(request)
-                models = await request.app.ctx.service_registry.get(self.target_service).read_all(limit, offset)
-                total: int = await Claim.all().count()
-                return json([await model.values_dict(m2m_fields=True, fk_fields=True,
-                                                     o2o_fields=True, backward_fk_fields=True) for model in models] + [
-                    {"total": total}])
-            model = await request.app.ctx.service_registry.get(self.target_service).read(entity)
+                if is_keyset(request):
+                    return await keyset_page(request, service.query_all(), limit,
+                                             m2m_fields=True, fk_fields=True,
+                                             o2o_fields=True, backward_fk_fields=True)
+                if not limit and not offset:
+                    return await stream_models(request, service.query_all(),
+                                               m2m_fields=True, fk_fields=True,
+                                               o2o_fields=True, backward_fk_fields=True)
+                models = await service.read_all(limit, offset, relations=RelationMeta.for_model(Claim).to_one,
+                                                overrides=self.relation_loading)
+                headers = {}
+                if (total := await get_total(request, service.query_all())) is not None:
+                    headers["X-Total-Count"] = str(total)
+                return json(await dump_models(models, m2m_fields=True, fk_fields=True,
+                                              o2o_fields=True, backward_fk_fields=True,
+                                              loader=BatchLoader.for_request(request)),
+                            headers=headers)
+            model = await service.read(entity)
             if model:
-                return json(await model.values_dict(m2m_fields=True, fk_fields=True,
-                                                    o2o_fields=True, backward_fk_fields=True))
+                return json(await dump_entity(request, model, m2m_fields=True, fk_fields=True,
+                                              o2o_fields=True, backward_fk_fields=True))
             else:
                 raise NotFound()
 
@@ -162,7 +323,9 @@ class VisitorController:
 
     class Create(BaseServiceController):
         enabled_scopes = ["root", "Администратор"]
+        statement_timeout = {"GET": settings.LIST_STATEMENT_TIMEOUT}
         target_route = "/visitors"
+        raw_rows = True
         post_dto = VisitorDto.CreationDto
         target_service = VisitorService
 
@@ -270,7 +433,9 @@ class PassController:
 
     class Create(BaseServiceController):
         target_route = "/passes"
+        raw_rows = True
         enabled_scopes = ["root", "Администратор"]
+        statement_timeout = {"GET": settings.LIST_STATEMENT_TIMEOUT}
         target_service = PassService
         post_dto = PassDto.CreationDto
 
@@ -350,6 +515,11 @@ class BlackListController:
         target_service = BlackListService
         put_dto = BlackListDto.UpdateDto
 
+    class Image(ImageRoute, BaseServiceController):
+        target_route = "/blacklists/<entity:int>/<field:str>"
+        enabled_scopes = ["root", "Администратор"]
+        target_service = BlackListService
+
 
 class VisitorPhotoController:
     returned_model = VisitorPhoto
@@ -366,6 +536,11 @@ class VisitorPhotoController:
         target_service = VisitorPhotoService
         put_dto = VisitorPhotoDto.UpdateDto
 
+    class Image(ImageRoute, BaseServiceController):
+        target_route = "/visitorphotos/<entity:int>/<field:str>"
+        enabled_scopes = ['root', "Администратор"]
+        target_service = VisitorPhotoService
+
 
 class WaterMarkController:
     returned_model = WaterMark
@@ -382,6 +557,11 @@ class WaterMarkController:
         target_service = WaterMarkService
         put_dto = WaterMarkDto.UpdateDto
 
+    class Image(ImageRoute, BaseServiceController):
+        target_route = "/watermarks/<entity:int>/<field:str>"
+        enabled_scopes = ['root', "Администратор"]
+        target_service = WaterMarkService
+
 
 class SystemSettingsController(BaseServiceController):
     returned_model = SystemSettings
@@ -21,14 +21,26 @@ from core.communication.celery.watcher import CeleryEventWatcher
 from core.errors.error_handler import ExtendedErrorHandler
 from core.server.auth import init_auth
 from core.server.controllers import BaseAccessController
-from core.server.routes import BaseServiceController
+from core.server.metrics import init_metrics, serve_metrics
+from core.server.permissions import PermissionMatrix
+from core.server.replica import ReadYourWrites
+from core.server.revocation import RevocationList
+from core.server.routes import BaseServiceController, RelatedCollectionController
+from core.server.session_cache import SessionCache
+from core.server.session_store import create_session_store
 from core.server.sse_monitoring import init_sse_monitoring
+from core.server.timeouts import apply_statement_timeout
+from core.utils.compression import ResponseCompressor
+from core.utils.executors import ExecutorRegistry
 from core.utils.license_count import LicenseCounter
 from core.utils.loggining import LogsHandler, logger
 from core.utils.mysignals import MySignalHandler
-from core.utils.orjson_default import odumps
-from infrastructure.database.connection import init_database_conn, sample_conf
+from core.utils.orjson_default import negotiate_datetime_format, odumps
+from infrastructure.database.connection import (configure_pools,
+                                                init_database_conn, sample_conf)
 from infrastructure.database.init_db import setup_db
+from infrastructure.database.pool import warm_up_pools
+from infrastructure.database.relations import RelationMeta
 
 
 class Server:
@@ -39,10 +51,13 @@ class Server:
         self._app_config = app_config
         self.sanic_app = Sanic('app', dumps=odumps, loads=loads)
         self._set_error_handler()
+        self._set_middlewares()
         self._configure_app()
         LogsHandler.setup_loggers()
         self._init_extentions()
         self._register_api()
+        # Before the first Tortoise.init(): workers inherit the configured pools, workload ones included
+        configure_pools(self._app_config.db_pools)
         self._setup()
         self._set_listeners()
         self._configure_openapi()
@@ -67,9 +82,19 @@ class Server:
     def _set_error_handler(self):
         self.sanic_app.error_handler = ExtendedErrorHandler()
 
+    def _set_middlewares(self):
+        self.sanic_app.register_middleware(negotiate_datetime_format, "request")
+        self.sanic_app.register_middleware(ReadYourWrites.route_reads, "request")
+        self.sanic_app.register_middleware(apply_statement_timeout, "request")
+        self.sanic_app.register_middleware(ReadYourWrites.stick_to_primary, "response")
+        self.sanic_app.register_middleware(ResponseCompressor.compress_response, "response")
+
     async def setup_worker_context(self, app: Sanic, _: asyncio.AbstractEventLoop):
         await EnabledScopeSetter().set_en_sc()
         await LicenseCounter.activate()
+        ExecutorRegistry.activate(self._app_config.executors)
+        ResponseCompressor.activate(self._app_config.compression)
+        ReadYourWrites.activate(self._app_config.replica)
         CeleryEventWatcher(self.emitter)
         app.ctx.config = self._app_config
         app.ctx.service_registry = ServiceRegistry(self.emitter)
@@ -84,12 +109,27 @@ class Server:
         SanicRoutesFormatter(self.sanic_app).create_sanic_js()
 
     def _set_listeners(self):
-        self.sanic_app.register_listener(self.setup_worker_context, "before_server_start")
-        self.sanic_app.register_listener(self.setup_redis, "before_server_start")
+        # Database goes first: Tortoise is initialized with the configured pools before anything queries it
         register_tortoise(self.sanic_app, sample_conf)
+        self.sanic_app.register_listener(warm_up_pools, "before_server_start")
+        self.sanic_app.register_listener(RelationMeta.build, "before_server_start")
+        # Redis before the worker context: PermissionMatrix has to be subscribed and loaded
+        # before controllers are bound to it
+        self.sanic_app.register_listener(self.setup_redis, "before_server_start")
+        self.sanic_app.register_listener(self.setup_worker_context, "before_server_start")
+        self.sanic_app.register_listener(self.teardown_worker_context, "before_server_stop")
 
     async def setup_redis(self, app, _):
         app.ctx.redis = aioredis.Redis.from_url(self._app_config.redis.url, decode_responses=True)
+        await SessionCache.activate(app, self._app_config.auth_cache)
+        await RevocationList.activate(app)
+        await PermissionMatrix.activate(app)
+        app.ctx.auth.use_session_store(create_session_store(app, self._app_config.session_store))
+        app.add_task(app.ctx.auth.session_store.run(self._app_config.session_store), name="session_store")
+
+    async def teardown_worker_context(self, app, _):
+        await app.ctx.auth.session_store.flush_last_seen()
+        ExecutorRegistry.shutdown()
 
     def _init_celery(self):
         def _start_celery():
@@ -110,11 +150,16 @@ class Server:
         init_sse_monitoring(self.sanic_app)
         init_archive_routes(self.sanic_app)
         init_web_push(self.sanic_app)
+        init_metrics(self.sanic_app)
 
     def _register_api(self):
 
         for controller in BaseServiceController.__subclasses__():
             self.sanic_app.add_route(controller.as_view(), controller.target_route)
+            # Detail responses cap backward relations and link to their sub-collections
+            if controller.target_route.endswith("/<entity:int>") and controller.get is BaseServiceController.get:
+                self.sanic_app.add_route(RelatedCollectionController.for_owner(controller).as_view(),
+                                         f"{controller.target_route}/related/<relation:str>", methods=["GET"])
 
         for controller in BaseAccessController.__subclasses__():
             self.sanic_app.add_route(controller.as_view(),
@@ -127,6 +172,7 @@ class Server:
             logger.info(f"> /{route.path}")
 
     def run(self):
+        serve_metrics()
         self.sanic_app.go_fast(host=settings.SANIC_HOST,
                                port=settings.SANIC_PORT,
                                debug=settings.SANIC_DEBUG,
@@ -0,0 +1,217 @@
+import asyncio
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from time import monotonic
+
+import pytz
+from aioredis import Redis
+from orjson import dumps, loads
+from sanic import Sanic
+
+import settings
+from config.config import AuthCacheConf
+from core.utils.loggining import logger
+from infrastructure.database.models import SystemUser
+
+
+class SessionPrincipal:
+    """
+    Result of a successful session validation.
+    Holds everything protect() needs, so a cache hit doesn't touch DB or crypto.
+    """
+    __slots__ = ("session_id", "user_id", "scopes", "expire_time", "user_fields")
+    _secret_fields = ("password", "salt")
+
+    def __init__(self, session_id: int, user_id: int, scopes: list[str], expire_time: datetime, user_fields: dict):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.scopes = scopes
+        self.expire_time = expire_time
+        self.user_fields = user_fields
+
+    @classmethod
+    def from_user(cls, session_id: int, user: SystemUser, expire_time: datetime,
+                  scopes: list[str] | None = None) -> "SessionPrincipal":
+        """scopes are names of user.scopes, taken from the prefetched relation if not given."""
+        user_fields = {field: getattr(user, field) for field in user._meta.db_fields
+                       if field not in cls._secret_fields}
+        if scopes is None:
+            scopes = [scope.name for scope in user.scopes]
+        return cls(session_id, user.id, scopes, expire_time, user_fields)
+
+    @property
+    def expired(self) -> bool:
+        return self.expire_time <= datetime.now(tz=pytz.UTC)
+
+    def user(self) -> SystemUser:
+        """SystemUser rebuilt from cached columns, without a DB round trip."""
+        return SystemUser._init_from_db(**self.user_fields)
+
+    def dumps(self, token_digest: str) -> bytes:
+        return dumps({"session_id": self.session_id,
+                      "user_id": self.user_id,
+                      "scopes": self.scopes,
+                      "expire_time": self.expire_time,
+                      "user_fields": self.user_fields,
+                      "digest": token_digest})
+
+    @classmethod
+    def loads(cls, raw: bytes | str) -> tuple["SessionPrincipal", str]:
+        data = loads(raw)
+        # JSON keeps datetimes as ISO strings, columns are converted back as the driver would return them
+        meta = SystemUser._meta
+        user_fields = {column: meta.fields_map[meta.fields_db_projection_reverse[column]].to_python_value(value)
+                       for column, value in data["user_fields"].items()}
+        principal = cls(data["session_id"],
+                        data["user_id"],
+                        data["scopes"],
+                        datetime.fromisoformat(data["expire_time"]),
+                        user_fields)
+        return principal, data["digest"]
+
+
+class SessionCache:
+    """
+    Validated sessions cache.
+    In-process LRU with a short TTL, backed by an optional Redis tier shared by all workers.
+    Invalidations are broadcast over Redis pub/sub, so every worker drops its local copy.
+    """
+    _local: OrderedDict[int, tuple[float, str, SessionPrincipal]] = OrderedDict()
+    _by_user: dict[int, set[int]] = {}
+    _conf: AuthCacheConf | None = None
+    _redis: Redis | None = None
+
+    @classmethod
+    async def activate(cls, app: Sanic, conf: AuthCacheConf) -> None:
+        cls._conf = conf
+        cls._local.clear()
+        cls._by_user.clear()
+        if conf.use_redis:
+            cls._redis = app.ctx.redis
+            app.add_task(cls._listen_invalidations(), name="session_cache_invalidations")
+
+    @staticmethod
+    def token_digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    @classmethod
+    async def get(cls, session_id: int, token: str) -> SessionPrincipal | None:
+        if cls._conf is None:
+            return None
+        digest = cls.token_digest(token)
+        if cached := cls._local.get(session_id):
+            deadline, cached_digest, principal = cached
+            if deadline > monotonic() and cached_digest == digest:
+                cls._local.move_to_end(session_id)
+                return principal
+            cls._drop_local(session_id)
+
+        if cls._redis is None:
+            return None
+        raw = await cls._redis.get(settings.SESSION_CACHE_KEY.format(session_id=session_id))
+        if raw is None:
+            return None
+        principal, cached_digest = SessionPrincipal.loads(raw)
+        if cached_digest != digest:
+            return None
+        cls._put_local(digest, principal)
+        return principal
+
+    @classmethod
+    async def set(cls, token: str, principal: SessionPrincipal) -> None:
+        if cls._conf is None:
+            return
+        digest = cls.token_digest(token)
+        cls._put_local(digest, principal)
+        if cls._redis is None:
+            return
+        ttl = int((principal.expire_time - datetime.now(tz=pytz.UTC)).total_seconds())
+        if ttl <= 0:
+            return
+        user_key = settings.SESSION_CACHE_USER_KEY.format(user_id=principal.user_id)
+        async with cls._redis.pipeline(transaction=False) as pipe:
+            pipe.set(settings.SESSION_CACHE_KEY.format(session_id=principal.session_id),
+                     principal.dumps(digest), ex=min(ttl, settings.SESSION_CACHE_MAX_TTL))
+            pipe.sadd(user_key, principal.session_id)
+            pipe.expire(user_key, settings.SESSION_CACHE_MAX_TTL)
+            await pipe.execute()
+
+    @classmethod
+    async def invalidate_session(cls, session_id: int) -> None:
+        cls._drop_local(session_id)
+        if cls._redis is not None:
+            await cls._redis.delete(settings.SESSION_CACHE_KEY.format(session_id=session_id))
+            await cls._publish({"session": session_id})
+
+    @classmethod
+    async def invalidate_user(cls, user_id: int) -> None:
+        """Called after SystemUser or its scopes were changed."""
+        for session_id in list(cls._by_user.get(user_id, ())):
+            cls._drop_local(session_id)
+        if cls._redis is not None:
+            user_key = settings.SESSION_CACHE_USER_KEY.format(user_id=user_id)
+            session_ids = await cls._redis.smembers(user_key)
+            keys = [settings.SESSION_CACHE_KEY.format(session_id=session_id) for session_id in session_ids]
+            await cls._redis.delete(user_key, *keys)
+            await cls._publish({"user": user_id})
+
+    @classmethod
+    async def clear(cls) -> None:
+        """Called after Role was changed: cached scope names may be stale for everybody."""
+        cls._local.clear()
+        cls._by_user.clear()
+        if cls._redis is not None:
+            keys = [key for pattern in (settings.SESSION_CACHE_KEY.format(session_id="*"),
+                                        settings.SESSION_CACHE_USER_KEY.format(user_id="*"))
+                    async for key in cls._redis.scan_iter(match=pattern)]
+            if keys:
+                await cls._redis.delete(*keys)
+            await cls._publish({"all": True})
+
+    @classmethod
+    def _put_local(cls, digest: str, principal: SessionPrincipal) -> None:
+        cls._local[principal.session_id] = (monotonic() + cls._conf.ttl, digest, principal)
+        cls._local.move_to_end(principal.session_id)
+        cls._by_user.setdefault(principal.user_id, set()).add(principal.session_id)
+        while len(cls._local) > cls._conf.max_size:
+            cls._drop_local(next(iter(cls._local)))
+
+    @classmethod
+    def _drop_local(cls, session_id: int) -> None:
+        cached = cls._local.pop(session_id, None)
+        if cached is None:
+            return
+        sessions = cls._by_user.get(cached[2].user_id)
+        if sessions is not None:
+            sessions.discard(session_id)
+            if not sessions:
+                del cls._by_user[cached[2].user_id]
+
+    @classmethod
+    async def _publish(cls, message: dict) -> None:
+        await cls._redis.publish(settings.SESSION_CACHE_EVENTS_KEY, dumps(message))
+
+    @classmethod
+    async def _listen_invalidations(cls) -> None:
+        pubsub = cls._redis.pubsub()
+        await pubsub.subscribe(settings.SESSION_CACHE_EVENTS_KEY)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                match loads(message["data"]):
+                    case {"session": session_id}:
+                        cls._drop_local(session_id)
+                    case {"user": user_id}:
+                        for session_id in list(cls._by_user.get(user_id, ())):
+                            cls._drop_local(session_id)
+                    case {"all": True}:
+                        cls._local.clear()
+                        cls._by_user.clear()
+        except asyncio.CancelledError:
+            pass
+        except Exception as ex:
+            logger.warning(f"Session cache invalidation listener crashed: {ex}")
+        finally:
+            await pubsub.close()
@@ -0,0 +1,126 @@
+import asyncio
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from time import monotonic
+
+import pytz
+from aioredis import Redis
+from sanic import Sanic
+
+import settings
+from config.config import SessionStoreConf
+from core.utils.loggining import logger
+from infrastructure.database.layer import SystemUserDbLayer
+from infrastructure.database.models import SystemUser, SystemUserSession
+
+
+class BaseSessionStore(ABC):
+    """
+    Where live sessions are kept.
+    SystemUserSession row is always created, it gives the session its id and keeps the audit trail
+    for SessionStoreConf.retention after the session is closed or expired.
+    Last seen timestamps are buffered in memory and written back to DB in batches.
+    """
+
+    def __init__(self):
+        self._last_seen: dict[int, datetime] = {}
+
+    async def create(self, user: SystemUser, user_agent: str, expire_at: datetime) -> SystemUserSession:
+        now = datetime.now().astimezone()
+        return await SystemUserSession.create(user=user,
+                                              user_agent=user_agent,
+                                              last_online=now,
+                                              created_at=now,
+                                              expire_time=expire_at,
+                                              )
+
+    @abstractmethod
+    async def is_live(self, session_id: int) -> bool:
+        """Whether the session is neither closed nor expired."""
+
+    def touch(self, session_id: int) -> None:
+        """Called on every authenticated request, must not do any IO."""
+        self._last_seen[session_id] = datetime.now(tz=pytz.UTC)
+
+    async def close(self, session_id: int, time: datetime) -> None:
+        self._last_seen.pop(session_id, None)
+        await SystemUserSession.filter(id=session_id).update(logout_time=time)
+
+    async def flush_last_seen(self) -> None:
+        last_seen, self._last_seen = self._last_seen, {}
+        if not last_seen:
+            return
+        try:
+            await SystemUserDbLayer.update_sessions_last_online(last_seen)
+        except Exception as ex:
+            # Put timestamps back unless newer ones arrived in the meantime
+            for session_id, time in last_seen.items():
+                self._last_seen.setdefault(session_id, time)
+            logger.warning(f"Failed to flush sessions last online: {ex}")
+
+    async def purge_expired(self, retention: float) -> int:
+        """Deletes sessions which were closed or expired more than retention seconds ago."""
+        cutoff = datetime.now(tz=pytz.UTC) - timedelta(seconds=retention)
+        deleted = await SystemUserDbLayer.delete_dead_sessions(cutoff)
+        if deleted:
+            logger.info(f"Purged {deleted} dead sessions")
+        return deleted
+
+    async def run(self, conf: SessionStoreConf) -> None:
+        """Background loop: write-behind of last seen timestamps and expired sessions sweeping."""
+        next_purge = monotonic()
+        while True:
+            await asyncio.sleep(conf.flush_interval)
+            await self.flush_last_seen()
+            if monotonic() >= next_purge:
+                next_purge = monotonic() + conf.purge_interval
+                try:
+                    await self.purge_expired(conf.retention)
+                except Exception as ex:
+                    logger.warning(f"Failed to purge expired sessions: {ex}")
+
+
+class DbSessionStore(BaseSessionStore):
+    """Live sessions are the SystemUserSession rows which are neither closed nor expired."""
+
+    async def is_live(self, session_id: int) -> bool:
+        return await SystemUserSession.exists(id=session_id,
+                                              logout_time__isnull=True,
+                                              expire_time__gt=datetime.now(tz=pytz.UTC))
+
+
+class RedisSessionStore(BaseSessionStore):
+    """Live sessions are Redis keys expiring together with the session, so auth lookups skip DB."""
+
+    def __init__(self, redis: Redis):
+        super().__init__()
+        self._redis = redis
+
+    @staticmethod
+    def _key(session_id: int) -> str:
+        return settings.SESSION_STORE_KEY.format(session_id=session_id)
+
+    async def create(self, user: SystemUser, user_agent: str, expire_at: datetime) -> SystemUserSession:
+        session = await super().create(user, user_agent, expire_at)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(session.id), user.id)
+            if expire_at != datetime.max:
+                pipe.expireat(self._key(session.id), int(expire_at.timestamp()))
+            await pipe.execute()
+        return session
+
+    async def is_live(self, session_id: int) -> bool:
+        return bool(await self._redis.exists(self._key(session_id)))
+
+    async def close(self, session_id: int, time: datetime) -> None:
+        await self._redis.delete(self._key(session_id))
+        await super().close(session_id, time)
+
+
+def create_session_store(app: Sanic, conf: SessionStoreConf) -> BaseSessionStore:
+    match conf.backend:
+        case "redis":
+            return RedisSessionStore(app.ctx.redis)
+        case "db":
+            return DbSessionStore()
+    raise ValueError(f"Unknown session store backend: {conf.backend}")
@@ -14,10 +14,13 @@ import settings
 from application.exceptions import InconsistencyError
 from core.dto.access import EntityId
 from core.server.auth import protect
+from core.utils.json_stream import stream_models
 from core.utils.limit_offset import get_limit_offset
+from core.utils.pagination import is_keyset, keyset_page
 from core.utils.loggining import logger
-from infrastructure.database.layer import DbLayer
 from infrastructure.database.models import StrangerThings, SystemUser
+from infrastructure.database.loader import BatchLoader
+from infrastructure.database.serializer import dump_models
 
 
 class BaseField(str):
@@ -121,30 +124,33 @@ class StrangerThingsEventsController(HTTPMethodView):
 class StrangerThingsController(HTTPMethodView):
     target_model = StrangerThings
     enabled_scopes = ["Сотрудник службы безопасности"]
+    statement_timeout = settings.LIST_STATEMENT_TIMEOUT
 
     @protect()
     async def get(self, request: Request, system_user: SystemUser, entity: EntityId = None) -> HTTPResponse:
+        # m2m relations are a part of every response, they are sent without validators
         if entity is None:
             limit, offset = await get_limit_offset(request)
+            if is_keyset(request):
+                return await keyset_page(request, self.target_model.all(), limit, m2m_fields=True)
+            if not limit and not offset:
+                return await stream_models(request, self.target_model.all(), m2m_fields=True)
             models = await self.read_all(limit, offset)
-            return json([await model.values_dict(m2m_fields=True) for model in models])
+            return json(await dump_models(models, m2m_fields=True, loader=BatchLoader.for_request(request)))
 
         model = await self.read(entity)
         if model:
-            return json(await model.values_dict(m2m_fields=True))
+            return json(await model.values_dict(m2m_fields=True, loader=BatchLoader.for_request(request)))
         else:
             raise NotFound()
 
     async def read_all(self,
                        limit: int = 0,
                        offset: int = 0) -> list[StrangerThings] | StrangerThings:
-        related_fields = await DbLayer.extract_relatable_fields(self.target_model)
-        query = self.target_model.all().prefetch_related(*related_fields)
-        return await query.limit(limit).offset(offset)
+        return await self.target_model.all().limit(limit).offset(offset)
 
     async def read(self, _id: EntityId) -> StrangerThings:
-        related_fields = await DbLayer.extract_relatable_fields(self.target_model)
-        return await self.target_model.get_or_none(id=_id).prefetch_related(*related_fields)
+        return await self.target_model.get_or_none(id=_id)
 
     @protect()
     async def post(self, request: Request, system_user: SystemUser):
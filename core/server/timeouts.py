@@ -0,0 +1,16 @@
+from collections.abc import Mapping
+
+from sanic import Request
+
+from infrastructure.database.pool import STATEMENT_TIMEOUT
+
+
+async def apply_statement_timeout(request: Request) -> None:
+    """
+    Request middleware: statements of the request are limited by statement_timeout of its controller,
+    seconds or seconds per HTTP method. Set on every request, keep-alive requests of a connection share the task.
+    Streamed responses are read after the handler returns, so the value is not reset when it ends.
+    """
+    view = getattr(request.route.handler, "view_class", None) if request.route else None
+    timeout = getattr(view, "statement_timeout", None)
+    STATEMENT_TIMEOUT.set(timeout.get(request.method) if isinstance(timeout, Mapping) else timeout)
@@ -0,0 +1,37 @@
+from typing import NamedTuple
+
+
+class ByteRange(NamedTuple):
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+    def content_range(self, size: int) -> str:
+        return f"bytes {self.start}-{self.end}/{size}"
+
+
+def parse_range(header: str | None, size: int) -> ByteRange | None:
+    """
+    Single range of Range: bytes=first-last, bytes=first- or bytes=-suffix.
+    None means the whole content: no header, another unit or several ranges.
+    ValueError means the range can't be satisfied and 416 should be returned.
+    """
+    if not header:
+        return None
+    unit, _, ranges = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+    first, _, last = ranges.strip().partition("-")
+    if not first and not last:
+        raise ValueError(header)
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start, end = max(size - int(last), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return ByteRange(start, end)
@@ -0,0 +1,180 @@
+import gzip
+import zlib
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Callable
+
+from prometheus_client import Counter
+from sanic import Request
+from sanic.compat import Header
+from sanic.response import HTTPResponse, ResponseStream
+
+from config.config import CompressionConf
+from core.utils.executors import ExecutorRegistry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+NOT_COMPRESSED_STATUSES = (204, 206, 304)
+
+COMPRESSION_BYTES = Counter("response_compression_bytes",
+                            "Response bytes before and after compression", ["encoding", "stage"])
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Best of br (if brotli is installed) and gzip by Accept-Encoding q-values, br wins a tie."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in ("br", "gzip") if brotli else ("gzip",):
+        if (weight := weights.get(encoding, weights.get("*", 0.0))) > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress_body(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+
+class StreamCompressor:
+    """Compresses a body written in chunks, every chunk is flushed so the client can read it at once."""
+    __slots__ = ("_compress", "_flush", "_finish")
+
+    def __init__(self, encoding: str, conf: CompressionConf):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=conf.brotli_quality)
+            self._compress, self._flush, self._finish = compressor.process, compressor.flush, compressor.finish
+        else:
+            # wbits 31 is the gzip container
+            compressor = zlib.compressobj(conf.gzip_level, zlib.DEFLATED, 31)
+            self._compress, self._finish = compressor.compress, compressor.flush
+            self._flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._compress(data) + self._flush()
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class _CompressedWriter:
+    """Stands for ResponseStream in its streaming_fn, compresses what is written."""
+    __slots__ = ("stream", "compressor", "encoding")
+
+    def __init__(self, stream: ResponseStream, encoding: str, conf: CompressionConf):
+        self.stream = stream
+        self.compressor = StreamCompressor(encoding, conf)
+        self.encoding = encoding
+
+    async def write(self, data: bytes | str) -> None:
+        if isinstance(data, str):
+            data = data.encode()
+        COMPRESSION_BYTES.labels(self.encoding, "in").inc(len(data))
+        await self._send(await ResponseCompressor.run(self.compressor.chunk, data, size=len(data)))
+
+    async def finish(self) -> None:
+        await self._send(self.compressor.finish())
+
+    async def _send(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        COMPRESSION_BYTES.labels(self.encoding, "out").inc(len(chunk))
+        await self.stream.write(chunk)
+
+
+class ResponseCompressor:
+    """
+    Response middleware: gzip or brotli by Accept-Encoding for text and JSON bodies above config.compression.min_size.
+    Streamed responses are compressed chunk by chunk whatever their size, they are never cached.
+    Other bodies are cached compressed by (digest of the body, encoding), so handbooks, the OpenAPI spec
+    and other rarely changing bodies are compressed once. ETags are not a key, most responses have none.
+    Bodies from config.compression.offload_size are compressed in the "compression" executor.
+    """
+    _conf: CompressionConf | None = None
+    _cache: OrderedDict[tuple[bytes, str], bytes] = OrderedDict()
+    _cache_size = 0
+
+    @classmethod
+    def activate(cls, conf: CompressionConf) -> None:
+        cls._conf = conf
+        cls._cache.clear()
+        cls._cache_size = 0
+
+    @classmethod
+    async def run(cls, func: Callable[..., bytes], *args: Any, size: int) -> bytes:
+        if size >= cls._conf.offload_size:
+            return await ExecutorRegistry.run(ExecutorRegistry.COMPRESSION, func, *args)
+        return func(*args)
+
+    @classmethod
+    def _cache_get(cls, key: tuple[bytes, str]) -> bytes | None:
+        if (body := cls._cache.get(key)) is not None:
+            cls._cache.move_to_end(key)
+        return body
+
+    @classmethod
+    def _cache_put(cls, key: tuple[bytes, str], body: bytes) -> None:
+        if len(body) > cls._conf.cache_entry_size or key in cls._cache:
+            return
+        cls._cache[key] = body
+        cls._cache_size += len(body)
+        while cls._cache_size > cls._conf.cache_size:
+            _, evicted = cls._cache.popitem(last=False)
+            cls._cache_size -= len(evicted)
+
+    @classmethod
+    async def compress_response(cls, request: Request, response: HTTPResponse | ResponseStream) -> None:
+        if cls._conf is None or response.status in NOT_COMPRESSED_STATUSES:
+            return
+        if not isinstance(headers := response.headers, Header):
+            # ResponseStream keeps a plain dict of the handler
+            response.headers = headers = Header(headers)
+        content_type = response.content_type or headers.get("content-type", "")
+        if "content-encoding" in headers or not content_type.startswith(COMPRESSIBLE_TYPES):
+            return
+        if isinstance(response, ResponseStream):
+            body = None
+        elif (body := response.body) is None or len(body) < cls._conf.min_size:
+            return
+        vary = headers.get("vary")
+        headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        if (encoding := negotiate_encoding(request.headers.get("accept-encoding"))) is None:
+            return
+
+        headers["Content-Encoding"] = encoding
+        if body is None:
+            streaming_fn = response.streaming_fn
+
+            async def compressed_fn(stream: ResponseStream):
+                writer = _CompressedWriter(stream, encoding, cls._conf)
+                await streaming_fn(writer)
+                await writer.finish()
+
+            response.streaming_fn = compressed_fn
+            return
+
+        key = (blake2b(body, digest_size=16).digest(), encoding)
+        if (compressed := cls._cache_get(key)) is None:
+            compressed = await cls.run(compress_body, body, encoding, cls._conf.gzip_level,
+                                       cls._conf.brotli_quality, size=len(body))
+            COMPRESSION_BYTES.labels(encoding, "in").inc(len(body))
+            COMPRESSION_BYTES.labels(encoding, "out").inc(len(compressed))
+            cls._cache_put(key, compressed)
+        response.body = compressed
@@ -0,0 +1,76 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import blake2b
+from typing import Any, Mapping, Sequence, Type
+
+from sanic import Request
+from sanic.response import HTTPResponse, empty
+from tortoise import Model
+
+from core.utils.orjson_default import DATETIME_FORMAT_HEADER
+from infrastructure.database.models import MODEL
+
+
+class Validators:
+    """
+    Weak ETag and Last-Modified of a response, computed from modified_at without serializing the body.
+    Query parameters and the datetime format are a part of the ETag, so every page and fieldset has its own.
+    modified_at covers own columns only: responses with relations are sent without validators.
+    """
+    __slots__ = ("etag", "last_modified")
+
+    def __init__(self, request: Request, *parts: object, last_modified: datetime | None):
+        digest = blake2b(digest_size=16)
+        for part in (*parts, last_modified and last_modified.timestamp(), request.query_string,
+                     request.headers.get(DATETIME_FORMAT_HEADER)):
+            digest.update(f"{part}\x00".encode())
+        self.etag = f'W/"{digest.hexdigest()}"'
+        self.last_modified = last_modified
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """If-None-Match with weak comparison, If-Modified-Since is checked only without it."""
+        if if_none_match := request.headers.get("if-none-match"):
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+        if (if_modified_since := request.headers.get("if-modified-since")) and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+    def not_modified(self) -> HTTPResponse:
+        return empty(status=304, headers=self.headers)
+
+
+async def entity_validators(request: Request, model: Type[MODEL], entity: int) -> Validators | None:
+    """None if there is no such entity."""
+    modified_at = await model.filter(id=entity).first().values_list("modified_at", flat=True)
+    if modified_at is None:
+        return None
+    return Validators(request, model._meta.db_table, entity, last_modified=modified_at)
+
+
+def page_validators(request: Request, model: Type[MODEL], rows: Sequence[MODEL | Mapping[str, Any]],
+                    *parts: object) -> Validators | None:
+    """
+    Validators of a list page computed from the rows it has just read, before they are serialized:
+    ids catch deleted and shifted rows, modified_at catches changes. None if modified_at wasn't selected.
+    """
+    pk = model._meta.pk_attr
+    versions, last_modified = [], None
+    for row in rows:
+        values = row.__dict__ if isinstance(row, Model) else row
+        if (modified_at := values.get("modified_at")) is None:
+            return None
+        versions.append((values.get(pk), modified_at.timestamp()))
+        last_modified = modified_at if last_modified is None else max(last_modified, modified_at)
+    return Validators(request, model._meta.db_table, versions, *parts, last_modified=last_modified)
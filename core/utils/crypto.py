@@ -1,9 +1,10 @@
 import hashlib
+import hmac
 import logging
 import random
 import string
 import sys
-from base64 import b64decode, b64encode
+from base64 import b64decode, b64encode, urlsafe_b64decode, urlsafe_b64encode
 from typing import Iterable
 from uuid import uuid4
 
@@ -102,6 +103,57 @@ class AESCrypto(BaseCrypto):
         return self._key_len
 
 
+class TokenSigner:
+    """
+    Session token format v2: "v2.<session_id>.<urlsafe b64 payload>.<urlsafe b64 mac>".
+    Master key is derived with scrypt only once per worker, every session gets its own
+    HMAC subkey, so verification costs a few microseconds and nothing is stored per row.
+    Payload is signed, not encrypted: keep only non-secret claims (user id, expiry) in it.
+    """
+    VERSION = "v2"
+    _master_salt = b"asbp-session-token-master-key"
+    _key_len = 32
+
+    def __init__(self, secret: str):
+        self._master_key = hashlib.scrypt(
+            secret.encode(), salt=self._master_salt, n=2 ** 14, r=8, p=1, dklen=self._key_len)
+
+    @classmethod
+    def is_own_format(cls, token: str) -> bool:
+        return token.startswith(f"{cls.VERSION}.")
+
+    @staticmethod
+    def _b64encode(data: bytes) -> str:
+        """Without padding: "=" is not allowed in cookie values."""
+        return urlsafe_b64encode(data).decode().rstrip("=")
+
+    @staticmethod
+    def _b64decode(data: str) -> bytes:
+        return urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+    def _mac(self, session_id: int, signed_part: bytes) -> bytes:
+        session_key = hmac.new(self._master_key, f"session:{session_id}".encode(), hashlib.sha256).digest()
+        return hmac.new(session_key, signed_part, hashlib.sha256).digest()
+
+    def sign(self, payload: str, session_id: int) -> str:
+        signed_part = f"{self.VERSION}.{session_id}.{self._b64encode(payload.encode())}"
+        mac = self._b64encode(self._mac(session_id, signed_part.encode()))
+        return f"{signed_part}.{mac}"
+
+    def verify(self, token: str) -> tuple[int, str]:
+        """
+        :return: session id the token was issued for and its payload.
+        :raises ValueError: if token is malformed or was forged.
+        """
+        signed_part, _, mac = token.rpartition(".")
+        version, session_id, payload = signed_part.split(".")
+        if version != self.VERSION or not session_id.isdigit():
+            raise ValueError("Unknown token format")
+        session_id = int(session_id)
+        if not hmac.compare_digest(self._mac(session_id, signed_part.encode()), self._b64decode(mac)):
+            raise ValueError("MAC check failed")
+        return session_id, self._b64decode(payload).decode()
+
 if __name__ == '__main__':
     cp = AESCrypto('asfasfsafasfsafsff')
     crypted = cp.encrypt("asfasgfasghsdhalkfdhmamnfhk;msldhmlsa;'dmh;sldmh;lsmdl;hml;")
@@ -0,0 +1,104 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from time import monotonic
+from typing import Any, Callable, TypeVar
+
+from prometheus_client import Gauge, Histogram
+
+from config.config import ExecutorConf
+from core.utils.loggining import logger
+
+T = TypeVar("T")
+
+EXECUTOR_QUEUE_DEPTH = Gauge("executor_queue_depth",
+                             "Tasks waiting for a free slot in the pool", ["pool"], multiprocess_mode="livesum")
+EXECUTOR_ACTIVE = Gauge("executor_active_tasks",
+                        "Tasks submitted to the pool and not finished yet", ["pool"],
+                        multiprocess_mode="livesum")
+EXECUTOR_WAIT_SECONDS = Histogram("executor_wait_seconds",
+                                  "Time spent waiting for a free slot in the pool", ["pool"])
+EXECUTOR_RUN_SECONDS = Histogram("executor_run_seconds",
+                                 "Time spent running in the pool", ["pool"])
+
+
+class ExecutorPool:
+    """Executor with a limit of concurrently submitted tasks, the rest are queued on the event loop."""
+    __slots__ = ("name", "executor", "max_concurrency", "_semaphore", "_waiting")
+
+    def __init__(self, conf: ExecutorConf):
+        self.name = conf.name
+        self.max_concurrency = conf.max_concurrency
+        self.executor: Executor
+        match conf.kind:
+            case "thread":
+                self.executor = ThreadPoolExecutor(max_workers=conf.max_workers, thread_name_prefix=conf.name)
+            case "process":
+                self.executor = ProcessPoolExecutor(max_workers=conf.max_workers)
+        self._semaphore: asyncio.Semaphore | None = None
+        self._waiting = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._waiting += 1
+        EXECUTOR_QUEUE_DEPTH.labels(self.name).inc()
+        queued_at = monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+            EXECUTOR_QUEUE_DEPTH.labels(self.name).dec()
+        started_at = monotonic()
+        EXECUTOR_WAIT_SECONDS.labels(self.name).observe(started_at - queued_at)
+        EXECUTOR_ACTIVE.labels(self.name).inc()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self._semaphore.release()
+            EXECUTOR_ACTIVE.labels(self.name).dec()
+            EXECUTOR_RUN_SECONDS.labels(self.name).observe(monotonic() - started_at)
+
+
+class ExecutorRegistry:
+    """
+    Named pools for CPU-bound and blocking code, so it doesn't stall the event loop.
+    Pools are configured in config.json "executors".
+    Process pools run only picklable module level functions.
+    """
+    CRYPTO = "crypto"
+    EXCEL = "excel"
+    IMAGES = "images"
+    BLOCKING_IO = "blocking_io"
+    COMPRESSION = "compression"
+
+    _pools: dict[str, ExecutorPool] = {}
+
+    @classmethod
+    def activate(cls, executors: list[ExecutorConf]) -> None:
+        cls._pools = {conf.name: ExecutorPool(conf) for conf in executors}
+
+    @classmethod
+    def get(cls, name: str) -> ExecutorPool | None:
+        return cls._pools.get(name)
+
+    @classmethod
+    async def run(cls, name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Runs func in the named pool, falls back to loop's default executor if the pool isn't configured."""
+        if kwargs:
+            func = partial(func, **kwargs)
+        pool = cls._pools.get(name)
+        if pool is None:
+            return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+        return await pool.run(func, *args)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        for pool in cls._pools.values():
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+            logger.info(f"Executor {pool.name} has been shut down")
+        cls._pools = {}
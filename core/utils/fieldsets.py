@@ -0,0 +1,61 @@
+from typing import Iterable, Type
+
+from sanic import Request
+
+from application.exceptions import InconsistencyError
+from infrastructure.database.models import MODEL
+
+
+class FieldSet:
+    """
+    Parsed ?fields=id,first_name&expand=passport,claim.
+    columns - what goes to SELECT, None means all columns.
+    expand - relations to fetch, None means the endpoint's default expansion.
+    """
+    __slots__ = ("columns", "expand")
+
+    def __init__(self, columns: tuple[str, ...] | None, expand: tuple[str, ...] | None):
+        self.columns = columns
+        self.expand = expand
+
+    @property
+    def is_default(self) -> bool:
+        return self.columns is None and self.expand is None
+
+
+def _split(value: str | None) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()] if value else []
+
+
+async def get_fieldset(request: Request, model: Type[MODEL], required: Iterable[str] = ()) -> FieldSet:
+    """
+    Fk relation names in fields are replaced with their columns: fields=passport means passport_id.
+    required columns are always selected, e.g. the ordering of cursor pagination.
+    """
+    meta = model._meta
+    fields = _split(request.args.get("fields"))
+    expand = _split(request.args.get("expand"))
+
+    relations = meta.fk_fields | meta.o2o_fields | meta.m2m_fields | meta.backward_fk_fields
+    unknown = [name for name in expand if name not in relations]
+    if unknown:
+        raise InconsistencyError(message=f"{model.__name__} has no relations: {unknown}.")
+
+    columns = None
+    if fields:
+        columns = {meta.pk_attr, *required}
+        for name in fields:
+            if name in meta.fields_db_projection:
+                columns.add(name)
+            elif name in meta.fk_fields or name in meta.o2o_fields:
+                columns.add(meta.fields_map[name].source_field)
+            else:
+                raise InconsistencyError(message=f"{model.__name__} has no field: {name}.")
+        # Expanded fk needs its column to be resolved
+        for name in expand:
+            if name in meta.fk_fields or name in meta.o2o_fields:
+                columns.add(meta.fields_map[name].source_field)
+        columns = tuple(columns)
+
+    # request.args drops blank values, an empty ?expand= means no relations
+    return FieldSet(columns, tuple(expand) if "expand" in request.get_args(keep_blank_values=True) else None)
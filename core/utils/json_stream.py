@@ -0,0 +1,52 @@
+from typing import Iterable, Type
+
+from sanic import Request
+from sanic.response import ResponseStream
+from tortoise.queryset import QuerySet
+
+from core.utils.orjson_default import odumps
+from infrastructure.database.layer import DbLayer
+from infrastructure.database.loader import BatchLoader
+from infrastructure.database.models import MODEL
+from infrastructure.database.pool import Workload, in_workload
+from infrastructure.database.serializer import ModelSerializer, dump_models
+
+
+async def stream_models(request: Request, query: QuerySet, expand: Iterable[str] | None = None,
+                        headers: dict[str, str] | None = None, **relations: bool) -> ResponseStream:
+    """
+    Writes query rows as a JSON array chunk by chunk.
+    Rows are serialized like dump_models(), relations are loaded per chunk,
+    so worker memory depends on config.streaming.chunk_size, not on the table size.
+    Whole tables are read through the reporting pool, a slow client does not hold an interactive connection.
+    """
+    chunk_size = request.app.ctx.config.streaming.chunk_size
+
+    async def streaming_fn(response: ResponseStream):
+        separator = b"["
+        async with in_workload(Workload.REPORTING):
+            async for models in DbLayer.iterate_chunks(query, chunk_size):
+                rows = await dump_models(models, loader=BatchLoader(), expand=expand, **relations)
+                # Array items without the enclosing brackets
+                await response.write(separator + odumps(rows)[1:-1])
+                separator = b","
+        await response.write(b"[]" if separator == b"[" else b"]")
+
+    return ResponseStream(streaming_fn, headers=headers, content_type="application/json")
+
+
+async def stream_records(request: Request, model: Type[MODEL], columns: tuple[str, ...],
+                         headers: dict[str, str] | None = None) -> ResponseStream:
+    """stream_models() of own fields without model instances, see DbLayer.fetch_records()."""
+    chunk_size = request.app.ctx.config.streaming.chunk_size
+    serializer = ModelSerializer.for_model(model)
+
+    async def streaming_fn(response: ResponseStream):
+        separator = b"["
+        async with in_workload(Workload.REPORTING):
+            async for records in DbLayer.iterate_records(model, columns, chunk_size):
+                await response.write(separator + odumps(serializer.dump_records(records))[1:-1])
+                separator = b","
+        await response.write(b"[]" if separator == b"[" else b"]")
+
+    return ResponseStream(streaming_fn, headers=headers, content_type="application/json")
@@ -9,6 +9,7 @@ import settings
 from application.service.asbp_archive import ArchiveController
 from application.service.web_push import WebPushController
 from core.server.controllers import BaseAccessController
+from core.server.permissions import PermissionMatrix
 from core.server.routes import BaseServiceController
 from core.server.sse_monitoring import (StrangerThingsController,
                                         StrangerThingsEventsController)
@@ -24,30 +25,24 @@ class MySignalHandler:
     @staticmethod
     async def enabled_scopes_signal_handler(**context) -> None:
         """
-        After changing scopes in ScopeConstructorAccess.update(),
-        changing enabled_scopes in appropriate Controller.
+        After PermissionMatrix applied a change (local or received from another worker),
+        refreshing enabled_scopes in every Controller bound to the changed route.
+        enable_scope_name=None means the whole matrix was reloaded.
         """
-        for controller in BaseAccessController.__subclasses__():
-            if controller.entity_name == context["enable_scope_name"]:
-                setattr(controller, "enabled_scopes", context["scopes"])
-                return
-
-        for controller in BaseServiceController.__subclasses__():
-            if controller.target_route == context["enable_scope_name"]:
-                setattr(controller, "enabled_scopes", context["scopes"])
-                return
-
         controllers = (
+            *BaseAccessController.__subclasses__(),
+            *BaseServiceController.__subclasses__(),
             StrangerThingsEventsController,
             StrangerThingsController,
             ArchiveController,
             WebPushController.Subscription,
             WebPushController.NotifyAll,
         )
-
+        name = context["enable_scope_name"]
         for controller in controllers:
-            setattr(controller, "enabled_scopes", context["scopes"])
-            return
+            route = getattr(controller, "permission_route", None)
+            if route is not None and name in (None, route):
+                setattr(controller, "enabled_scopes", PermissionMatrix.route_roles(route))
 
     @staticmethod
     @post_save(StrangerThings)
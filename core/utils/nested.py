@@ -0,0 +1,40 @@
+from typing import Any, Iterable, Type
+
+from sanic import Request
+
+from core.utils.pagination import KEYSET_ORDERING
+from infrastructure.database.loader import BatchLoader
+from infrastructure.database.models import MODEL
+
+
+def bounded_relations(model: Type[MODEL]) -> tuple[str, ...]:
+    """Backward relations served as sub-collections, their rows must be orderable by KEYSET_ORDERING."""
+    meta = model._meta
+    return tuple(sorted(relation for relation in meta.backward_fk_fields
+                        if all(name in meta.fields_map[relation].related_model._meta.fields_map
+                               for name in KEYSET_ORDERING)))
+
+
+def nested_limits(request: Request, model: Type[MODEL]) -> dict[str, int]:
+    """
+    config.nested.relations["Model.relation"] or config.nested.limit for every bounded relation.
+    0 leaves the relation unbounded.
+    """
+    conf = request.app.ctx.config.nested
+    limits = {relation: conf.relations.get(f"{model.__name__}.{relation}", conf.limit)
+              for relation in bounded_relations(model)}
+    return {relation: limit for relation, limit in limits.items() if limit > 0}
+
+
+async def dump_entity(request: Request, model: MODEL, expand: Iterable[str] | None = None,
+                      **relations: bool) -> dict[str, Any]:
+    """
+    values_dict() of a detail response with backward relations capped by nested_limits().
+    Capped relations are {"items": [...], "has_more": bool, "href": sub-collection URL}.
+    """
+    limits = nested_limits(request, type(model))
+    row = await model.values_dict(loader=BatchLoader.for_request(request), expand=expand, limits=limits, **relations)
+    for relation in limits:
+        if isinstance(nested := row.get(relation), dict):
+            nested["href"] = f"{request.path}/related/{relation}?after="
+    return row
@@ -1,20 +1,99 @@
 import datetime
-import json
-from functools import partial
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache, partial
 
 import orjson
+from sanic import Request
 
 import settings
 
+# Set per request by negotiate_datetime_format(), responses are serialized in the request's task
+ISO_DATETIMES: ContextVar[bool] = ContextVar("iso_datetimes", default=False)
+DATETIME_FORMAT_HEADER = "x-datetime-format"
+
+_TWO_DIGITS = tuple(f"{i:02d}" for i in range(100))
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+class DatetimeFormatter:
+    """
+    datetime.astimezone().strftime(fmt) without astimezone() and strftime() per value.
+    Local UTC offset is cached per hour and the date part of fmt per day,
+    only hours, minutes and seconds are formatted for every value.
+    Formats with other time directives (%f, %p, %z...) fall back to strftime.
+    """
+    __slots__ = ("fmt", "order", "_day_template")
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self.order: tuple[int, ...] | None = None
+        fields = re.findall(r"%([HMS])", fmt)
+        if not re.search(r"%[^HMSdmyYaAbBjUWwe%]", fmt) and len(fields) == len(set(fields)):
+            self.order = tuple("HMS".index(field) for field in fields)
+        self._day_template = lru_cache(maxsize=4096)(self._render_day)
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _local_offset(hour: int) -> int:
+        return time.localtime(hour * 3600).tm_gmtoff
+
+    def _render_day(self, day: int) -> str:
+        """fmt rendered for the day, %H, %M and %S are left as %s placeholders."""
+        rendered = datetime.date.fromordinal(day + _EPOCH_ORDINAL).strftime(re.sub(r"%([HMS])", r"{\1}", self.fmt))
+        rendered = rendered.replace("%", "%%")
+        for field in "HMS":
+            rendered = rendered.replace("{%s}" % field, "%s")
+        return rendered
+
+    def __call__(self, value: datetime.datetime) -> str:
+        if self.order is None:
+            return value.astimezone().strftime(self.fmt)
+        seconds = (value.toordinal() - _EPOCH_ORDINAL) * 86400 + value.hour * 3600 + value.minute * 60 + value.second
+        # Naive values are local time already, astimezone() keeps them as is
+        if (offset := value.utcoffset()) is not None:
+            seconds -= offset.days * 86400 + offset.seconds
+            seconds += self._local_offset(seconds // 3600)
+        day, seconds = divmod(seconds, 86400)
+        hours, seconds = divmod(seconds, 3600)
+        minutes, seconds = divmod(seconds, 60)
+        parts = (_TWO_DIGITS[hours], _TWO_DIGITS[minutes], _TWO_DIGITS[seconds])
+        if self.order != (0, 1, 2):
+            parts = tuple(parts[index] for index in self.order)
+        return self._day_template(day) % parts
+
+
+format_datetime = DatetimeFormatter(settings.DATETIME_FORMAT)
+
 
 def default(obj):
+    obj_type = type(obj)
+    if obj_type is datetime.datetime:
+        return format_datetime(obj)
+    if obj_type is datetime.date:
+        return obj.strftime(settings.DATE_FORMAT)
     if hasattr(obj, "__json__"):
-        return json.loads(obj.__json__())
+        return orjson.loads(obj.__json__())
     if isinstance(obj, datetime.datetime):
-        return obj.astimezone().strftime(settings.DATETIME_FORMAT)
+        return format_datetime(obj)
     if isinstance(obj, datetime.date):
         return obj.strftime(settings.DATE_FORMAT)
     raise TypeError
 
 
-odumps = partial(orjson.dumps, option=orjson.OPT_PASSTHROUGH_DATETIME, default=default)
+_dumps_formatted = partial(orjson.dumps, option=orjson.OPT_PASSTHROUGH_DATETIME, default=default)
+_dumps_iso = partial(orjson.dumps, default=default)
+
+
+def odumps(obj) -> bytes:
+    """Datetimes as settings.DATETIME_FORMAT in local time, or ISO 8601 if the client asked for it."""
+    if ISO_DATETIMES.get():
+        return _dumps_iso(obj)
+    return _dumps_formatted(obj)
+
+
+async def negotiate_datetime_format(request: Request) -> None:
+    """Request middleware: X-Datetime-Format: iso switches the response to ISO 8601 datetimes."""
+    # Set on every request, keep-alive requests of a connection share the task
+    ISO_DATETIMES.set(request.headers.get(DATETIME_FORMAT_HEADER, "").lower() == "iso")
@@ -0,0 +1,97 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as DecodeError
+from datetime import datetime
+from typing import Iterable
+
+from orjson import JSONDecodeError, dumps, loads
+from sanic import Request
+from sanic.response import HTTPResponse, json
+from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
+
+import settings
+from application.exceptions import InconsistencyError
+from core.utils.conditional import page_validators
+from infrastructure.database.layer import DbLayer
+from infrastructure.database.loader import BatchLoader
+from infrastructure.database.models import MODEL
+from infrastructure.database.serializer import dump_models
+
+KEYSET_ORDERING = ("created_at", "id")
+
+
+def is_keyset(request: Request) -> bool:
+    """?after= switches a list to cursor pagination, an empty value requests the first page."""
+    # request.args drops blank values
+    return "after" in request.get_args(keep_blank_values=True)
+
+
+def encode_cursor(model: MODEL) -> str:
+    return urlsafe_b64encode(dumps([model.created_at.isoformat(), model.id])).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, _id = loads(urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(_id)
+    except (DecodeError, JSONDecodeError, TypeError, ValueError):
+        raise InconsistencyError(message="Invalid pagination cursor.")
+
+
+async def read_after(query: QuerySet[MODEL], cursor: str | None, limit: int) -> tuple[list[MODEL], str | None]:
+    """
+    One page ordered by (created_at, id) starting after cursor.
+    The condition is an index range scan on (created_at, id), so any page costs the same.
+    """
+    limit = limit or settings.KEYSET_PAGE_SIZE
+    if cursor:
+        created_at, _id = decode_cursor(cursor)
+        query = query.filter(created_at__gte=created_at).filter(Q(created_at__gt=created_at) | Q(id__gt=_id))
+    models = await query.order_by(*KEYSET_ORDERING).limit(limit + 1)
+    if len(models) > limit:
+        models = models[:limit]
+        return models, encode_cursor(models[-1])
+    return models, None
+
+
+async def get_total(request: Request, query: QuerySet[MODEL]) -> int | None:
+    """
+    ?total=estimated - planner's estimate of the table size,
+    ?total=exact - count(*) cached in Redis for settings.TOTAL_COUNT_TTL seconds.
+    Without the parameter the total isn't counted at all.
+    """
+    match request.args.get("total"):
+        case None:
+            return None
+        case "estimated":
+            return await DbLayer.estimate_count(query.model)
+        case "exact":
+            key = settings.TOTAL_COUNT_KEY.format(table=query.model._meta.db_table)
+            if (cached := await request.app.ctx.redis.get(key)) is not None:
+                return int(cached)
+            total = await query.count()
+            await request.app.ctx.redis.set(key, total, ex=settings.TOTAL_COUNT_TTL)
+            return total
+        case _:
+            raise InconsistencyError(message="total must be 'estimated' or 'exact'.")
+
+
+async def keyset_page(request: Request, query: QuerySet[MODEL], limit: int,
+                      expand: Iterable[str] | None = None, **relations: bool) -> HTTPResponse:
+    """
+    {"items": [...], "next_cursor": "..." or null, "total": only if requested}.
+    A page without relations is a conditional response, its validators are computed from the page rows.
+    """
+    models, next_cursor = await read_after(query, request.args.get("after"), limit)
+    total = await get_total(request, query)
+    headers = {}
+    if not (expand if expand is not None else any(relations.values())):
+        if (validators := page_validators(request, query.model, models, next_cursor, total)) is not None:
+            if validators.matches(request):
+                return validators.not_modified()
+            headers = validators.headers
+    page = {"items": await dump_models(models, loader=BatchLoader.for_request(request), expand=expand, **relations),
+            "next_cursor": next_cursor}
+    if total is not None:
+        page["total"] = total
+    return json(page, headers=headers)
@@ -1,12 +1,11 @@
-from tortoise import fields
-
+from infrastructure.database.json_codec import JSONField
 from infrastructure.database.models import AbstractBaseModel, TimestampMixin
 
 
 class Archive(AbstractBaseModel, TimestampMixin):
     """База данных архива"""
-    pass_id = fields.JSONField(null=True, description="Данные пропуска")
-    visitor = fields.JSONField(null=True, description="Данные посетителя")
+    pass_id = JSONField(null=True, description="Данные пропуска")
+    visitor = JSONField(null=True, description="Данные посетителя")
 
     def __str__(self):
         return f"Пропуск: {self.pass_id},\nПосетитель: {self.visitor}"
@@ -1,11 +1,15 @@
+from copy import deepcopy
+
 from tortoise import BaseDBAsyncClient, Tortoise, connections
 
 import settings
+from config.config import DbPoolConf
+from infrastructure.database.pool import REPLICA
 
 sample_conf = {
     'connections': {
         settings.CONNECTION_NAME: {
-            'engine': 'tortoise.backends.asyncpg',
+            'engine': 'infrastructure.database.pool',
 
             'credentials': {
                 'host': settings.DB_HOST,
@@ -20,7 +24,7 @@ sample_conf = {
 
         },
         settings.CONNECTION_NAME_ARCHIVE: {
-            'engine': 'tortoise.backends.asyncpg',
+            'engine': 'infrastructure.database.pool',
 
             'credentials': {
                 'host': settings.DB_HOST,
@@ -50,6 +54,33 @@ sample_conf = {
     'timezone': 'UTC'
 }
 
+if settings.DB_REPLICA_HOST:
+    for _name in (settings.CONNECTION_NAME, settings.CONNECTION_NAME_ARCHIVE):
+        _replica = deepcopy(sample_conf['connections'][_name])
+        _replica['credentials'].update(host=settings.DB_REPLICA_HOST, port=settings.DB_REPLICA_PORT, alias_of=_name)
+        sample_conf['connections'][f'{_name}.replica'] = _replica
+
+
+def configure_pools(pools: dict[str, DbPoolConf]) -> None:
+    """
+    Pool settings of config.json over the defaults of sample_conf, before Tortoise is initialized.
+    "<connection>.<workload>" pools are added as connections to the same database, see infrastructure.database.pool.
+    """
+    connections = sample_conf['connections']
+    for name, pool in pools.items():
+        if name not in connections:
+            alias_of, _, workload = name.partition('.')
+            if workload == REPLICA:
+                # Replicas come from settings.DB_REPLICA_HOST only
+                continue
+            connections[name] = deepcopy(connections[alias_of])
+            connections[name]['credentials']['alias_of'] = alias_of
+        credentials = connections[name]['credentials']
+        credentials.update(pool.dict(exclude_none=True, exclude={'statement_timeout'}))
+        if pool.statement_timeout is not None:
+            credentials['server_settings'] = {**credentials.get('server_settings', {}),
+                                              'statement_timeout': str(int(pool.statement_timeout * 1000))}
+
 
 async def init_database_conn() -> tuple[BaseDBAsyncClient, BaseDBAsyncClient]:
     await Tortoise.init(config=sample_conf)
@@ -1,4 +1,8 @@
+from pathlib import Path
+
 from aerich import Command
+from aerich.models import Aerich
+from aerich.utils import get_models_describe
 from loguru import logger
 from sanic import Sanic
 from tortoise import BaseDBAsyncClient, Tortoise
@@ -17,6 +21,8 @@ from infrastructure.database.models import (BlackList, Claim, ClaimToZone,
                                             Transport, Visitor, VisitSession,
                                             Zone)
 
+MIGRATIONS_LOCATION = f"{settings.BASE_DIR}/infrastructure/database/migrations/"
+
 
 @atomic(settings.CONNECTION_NAME)
 async def fill_with_default_data() -> None:
@@ -161,12 +167,21 @@ async def fill_with_default_data() -> None:
     ])
 
 
-async def make_migrations() -> None:
-    """Making initial migrations"""
-    import subprocess
+def shipped_migrations() -> list[Path]:
+    """Migrations of MIGRATIONS_LOCATION in the order aerich applies them."""
+    return sorted(Path(MIGRATIONS_LOCATION, settings.CONNECTION_NAME).glob("*.sql"),
+                  key=lambda version: int(version.name.split("_")[0]))
 
+
+async def make_migrations() -> None:
+    """
+    New database gets its schema with every index of the models from generate_schemas(),
+    migrations shipped in MIGRATIONS_LOCATION are recorded as applied.
+    """
     logger.info("Making migrations...")
-    subprocess.run(settings.AERICH_MIGRATION_COMMANDS, shell=True)
+    content = get_models_describe(settings.CONNECTION_NAME)
+    for version in shipped_migrations():
+        await Aerich.create(version=version.name, app=settings.CONNECTION_NAME, content=content)
     logger.info("Initial migrations has finished.")
 
 
@@ -186,13 +201,17 @@ async def setup_db(conn: BaseDBAsyncClient, app: Sanic, conn_archive: BaseDBAsyn
         await init_scopes(app)
         await make_migrations()
     else:
+        # 0_..._init.sql is the schema existing databases were created with, it only fills in
+        # the aerich table where "aerich init-db" has not run
+        command = Command(tortoise_config=sample_conf,
+                          app=settings.CONNECTION_NAME,
+                          location=MIGRATIONS_LOCATION)
+        await command.init()
+        logger.info("Applying migrations...")
+        for version in await command.upgrade():
+            logger.info(f"Migration {version} applied.")
         if settings.DEBUG is True:
-            command = Command(tortoise_config=sample_conf,
-                              app="asbp",
-                              location=f"{settings.BASE_DIR}/infrastructure/database/migrations/")
-            await command.init()
+            # Model changes of the working copy go to a new migration, it is applied on the next start
             await command.migrate()
-            logger.info("Applying migrations...")
 
-            await Tortoise.close_connections()
-        pass
+        await Tortoise.close_connections()
@@ -0,0 +1,51 @@
+"""
+One JSON codec for json/jsonb columns, backed by orjson.
+asyncpg connections of infrastructure.database.pool decode the columns with it while reading rows,
+JSONField encodes values with it and decodes what comes as text from other clients.
+Clients whose connections have the codec set decodes_json = True.
+"""
+from functools import partial
+from typing import Any
+
+import asyncpg
+import orjson
+from tortoise import connections, fields
+
+# Datetimes are stored as ISO 8601, the same as Tortoise did with orjson
+_dumps = partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+loads = orjson.loads
+
+
+def dumps(value: Any) -> str:
+    return _dumps(value).decode()
+
+
+def _encode(value: Any) -> str:
+    # JSONField hands over text it has encoded already, raw queries may pass Python values
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bytes):
+        return value.decode()
+    return dumps(value)
+
+
+async def register_json_codecs(connection: asyncpg.Connection) -> None:
+    """asyncpg pool init, goes before statements are prepared: they keep the codecs they were prepared with."""
+    for name in ("json", "jsonb"):
+        await connection.set_type_codec(name, encoder=_encode, decoder=loads, schema="pg_catalog", format="text")
+
+
+class JSONField(fields.JSONField):
+    """fields.JSONField with the codec of the connection."""
+
+    def __init__(self, **kwargs: Any):
+        kwargs.setdefault("encoder", dumps)
+        kwargs.setdefault("decoder", loads)
+        super().__init__(**kwargs)
+
+    def to_python_value(self, value: Any) -> Any:
+        # A JSON string is a str after the codec, decoding it again fails or changes its type ("123" -> 123)
+        if isinstance(value, str) and getattr(connections.get(self.model._meta.default_connection),
+                                              "decodes_json", False):
+            return value
+        return super().to_python_value(value)
@@ -1,13 +1,27 @@
 from datetime import datetime
-from typing import Type
+from functools import lru_cache
+from typing import Any, AsyncIterator, Mapping, NamedTuple, Type
 
+from tortoise import connections
 from tortoise.expressions import Q
 from tortoise.fields import Field
-from tortoise.fields.relational import RelationalField
 from tortoise.queryset import QuerySet, QuerySetSingle
+from tortoise.transactions import in_transaction
 
+import settings
 from core.dto.access import EntityId
 from infrastructure.database.models import MODEL, SystemUser, SystemUserSession
+from infrastructure.database.relations import plan_relations
+
+
+# Bytes of a blob enough to tell its content type, see core.utils.media
+BLOB_HEAD_SIZE = 12
+
+
+class BlobState(NamedTuple):
+    modified_at: datetime
+    size: int | None
+    head: bytes | None
 
 
 class SystemUserDbLayer:
@@ -40,12 +54,37 @@ class SystemUserDbLayer:
 
     @staticmethod
     async def get_session_id(user_id: int, agent: str):
-        sessions = await SystemUserSession.filter(user_id=user_id, user_agent=agent)
-        need_id = sessions[-1].id
-        for ses in sessions:
-            if ses.id != need_id:
-                await ses.delete()
-        return need_id
+        need_id = await SystemUserSession.filter(user_id=user_id, user_agent=agent).order_by("-id").first()
+        await SystemUserSession.filter(user_id=user_id, user_agent=agent).exclude(id=need_id.id).delete()
+        return need_id.id
+
+    @staticmethod
+    async def update_sessions_last_online(last_online: dict[int, datetime]) -> int:
+        """
+        Writes a batch of last seen timestamps with a single UPDATE.
+
+        :param last_online: session id -> last request time.
+        :return: number of updated rows.
+        """
+        if not last_online:
+            return 0
+        table = SystemUserSession._meta.db_table
+        rows, _ = await connections.get(settings.CONNECTION_NAME).execute_query(
+            f'UPDATE "{table}" AS s SET "last_online" = GREATEST(s.last_online, v.last_online) '
+            f'FROM (SELECT unnest($1::int[]) AS id, unnest($2::timestamptz[]) AS last_online) AS v '
+            f'WHERE s.id = v.id',
+            [list(last_online.keys()), list(last_online.values())]
+        )
+        return rows
+
+    @staticmethod
+    async def delete_dead_sessions(time: datetime) -> int:
+        """
+        Bulk purge of sessions which expired or were closed before time.
+
+        :return: number of deleted rows.
+        """
+        return await SystemUserSession.filter(Q(expire_time__lt=time) | Q(logout_time__lt=time)).delete()
 
     @staticmethod
     async def get_system_user(username: str) -> SystemUser:
@@ -89,9 +128,133 @@ class DbLayer(SystemUserDbLayer):
         pass
 
     @staticmethod
-    async def extract_relatable_fields(model: Type[MODEL]) -> list[str]:
-        return [field for field, sheme in model._meta.fields_map.items() if
-                sheme.__class__.__base__ == RelationalField]
+    async def iterate_chunks(query: QuerySet[MODEL], chunk_size: int) -> AsyncIterator[list[MODEL]]:
+        """
+        Reads query rows chunk by chunk, only one chunk is kept in memory.
+        On PostgreSQL rows come from a server-side cursor opened in a transaction,
+        other backends page over the primary key.
+        """
+        model = query.model
+        async with in_transaction(settings.CONNECTION_NAME) as connection:
+            if connection.capabilities.dialect == "postgres":
+                chunk: list[MODEL] = []
+                async for record in connection._connection.cursor(query.sql(), prefetch=chunk_size):
+                    chunk.append(model._init_from_db(**record))
+                    if len(chunk) == chunk_size:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+                return
+
+        pk = model._meta.pk_attr
+        last = None
+        while True:
+            page = query.order_by(pk).limit(chunk_size)
+            if last is not None:
+                page = page.filter(**{f"{pk}__gt": last})
+            chunk = await page
+            if not chunk:
+                return
+            yield chunk
+            last = getattr(chunk[-1], pk)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def select_statement(model: Type[MODEL], columns: tuple[str, ...], suffix: str = "") -> str:
+        """SELECT of columns aliased to their field names, compiled once per projection."""
+        return model.all().only(*columns).sql() + suffix
+
+    @staticmethod
+    async def fetch_records(model: Type[MODEL], columns: tuple[str, ...],
+                            limit: int = 0, offset: int = 0) -> list[Mapping[str, Any]]:
+        """
+        Rows of model without model instances, for ModelSerializer.dump_records().
+        The statement text is compiled once per projection. On PostgreSQL asyncpg prepares it
+        once per connection and its Records are returned as they are, on SQLite rows are plain dicts.
+        """
+        connection = connections.get(settings.CONNECTION_NAME)
+        if connection.capabilities.dialect == "postgres":
+            sql = DbLayer.select_statement(model, columns, " LIMIT $1 OFFSET $2")
+            async with connection.acquire_connection() as raw_connection:
+                return await raw_connection.fetch(sql, limit or None, offset)
+        # LIMIT -1 is SQLite's "no limit"
+        return await connection.execute_query_dict(DbLayer.select_statement(model, columns, " LIMIT ? OFFSET ?"),
+                                                   [limit or -1, offset])
+
+    @staticmethod
+    async def blob_state(model: Type[MODEL], entity: EntityId, field: str) -> BlobState | None:
+        """modified_at, octet length and the first bytes of a blob column without reading it. None if no entity."""
+        connection = connections.get(model._meta.default_connection)
+        column, table = model._meta.fields_db_projection[field], model._meta.db_table
+        if connection.capabilities.dialect == "postgres":
+            sql = (f'SELECT "modified_at", octet_length("{column}") AS "size", '
+                   f'substring("{column}" from 1 for {BLOB_HEAD_SIZE}) AS "head" FROM "{table}" WHERE "id" = $1')
+        else:
+            sql = (f'SELECT "modified_at", length("{column}") AS "size", '
+                   f'substr("{column}", 1, {BLOB_HEAD_SIZE}) AS "head" FROM "{table}" WHERE "id" = ?')
+        rows = await connection.execute_query_dict(sql, [entity])
+        if not rows:
+            return None
+        row = rows[0]
+        modified_at = model._meta.fields_map["modified_at"].to_python_value(row["modified_at"])
+        return BlobState(modified_at, row["size"], row["head"] and bytes(row["head"]))
+
+    @staticmethod
+    async def read_blob(model: Type[MODEL], entity: EntityId, field: str, start: int, length: int) -> bytes | None:
+        """length bytes of a blob column from start (0-based), cut by the database."""
+        connection = connections.get(model._meta.default_connection)
+        column, table = model._meta.fields_db_projection[field], model._meta.db_table
+        if connection.capabilities.dialect == "postgres":
+            sql = f'SELECT substring("{column}" from $2 for $3) AS "data" FROM "{table}" WHERE "id" = $1'
+            values = [entity, start + 1, length]
+        else:
+            sql = f'SELECT substr("{column}", ?, ?) AS "data" FROM "{table}" WHERE "id" = ?'
+            values = [start + 1, length, entity]
+        rows = await connection.execute_query_dict(sql, values)
+        return bytes(rows[0]["data"]) if rows and rows[0]["data"] is not None else None
+
+    @staticmethod
+    async def iterate_records(model: Type[MODEL], columns: tuple[str, ...],
+                              chunk_size: int) -> AsyncIterator[list[Mapping[str, Any]]]:
+        """iterate_chunks() without model instances, rows are the same as fetch_records() returns."""
+        async with in_transaction(settings.CONNECTION_NAME) as connection:
+            if connection.capabilities.dialect == "postgres":
+                chunk = []
+                sql = DbLayer.select_statement(model, columns)
+                async for record in connection._connection.cursor(sql, prefetch=chunk_size):
+                    chunk.append(record)
+                    if len(chunk) == chunk_size:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+                return
+
+        pk = model._meta.pk_attr
+        last = None
+        while True:
+            page = model.all().order_by(pk).limit(chunk_size)
+            if last is not None:
+                page = page.filter(**{f"{pk}__gt": last})
+            chunk = await page.values(*columns)
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1][pk]
+
+    @staticmethod
+    async def estimate_count(model: Type[MODEL]) -> int:
+        """Planner's row estimate from pg_class, exact count if the table was never analyzed."""
+        connection = connections.get(settings.CONNECTION_NAME)
+        if connection.capabilities.dialect == "postgres":
+            _, rows = await connection.execute_query(
+                "SELECT reltuples::bigint AS estimate FROM pg_class WHERE oid = $1::regclass",
+                [f'"{model._meta.db_table}"']
+            )
+            if rows and rows[0]["estimate"] >= 0:
+                return rows[0]["estimate"]
+        return await model.all().count()
 
     @staticmethod
     async def contains_by_id(model: Type[MODEL], _id: int) -> bool:
@@ -133,8 +296,11 @@ class DbLayer(SystemUserDbLayer):
         else:
             query: QuerySetSingle = model.get_or_none(id=_id)
         if columns is None:
-            related = await DbLayer.extract_relatable_fields(model)
-            return await query.prefetch_related(*related)
+            plan = plan_relations(model)
+            result = await plan.apply(query)
+            if result:
+                await plan.load(result if isinstance(result, list) else [result])
+            return result
         else:
             cols: list[str] = [col.model_field_name for col in columns]
             rows = await query.values(*cols)
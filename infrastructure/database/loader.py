@@ -0,0 +1,77 @@
+from collections import defaultdict
+from typing import Any, Type
+
+from sanic import Request
+from tortoise import Model
+from tortoise.queryset import QuerySet
+
+from infrastructure.database.serializer import ModelSerializer
+
+
+class BatchLoader:
+    """
+    Request-scoped relation loader.
+    Relation keys are collected across the whole page and every relation is resolved with one IN (...) query,
+    so a page costs the same number of queries whatever its size.
+    Rows loaded once during the request are reused, e.g. the same ClaimWay of a hundred claims is read once.
+    Blob columns of related rows are not selected.
+    """
+    __slots__ = ("_identity",)
+
+    def __init__(self):
+        self._identity: dict[tuple[Type[Model], str], dict[Any, Model]] = {}
+
+    @classmethod
+    def for_request(cls, request: Request) -> "BatchLoader":
+        loader = getattr(request.ctx, "batch_loader", None)
+        if loader is None:
+            loader = request.ctx.batch_loader = cls()
+        return loader
+
+    async def load(self, instances: list[Model], *relations: str) -> None:
+        if not instances:
+            return
+        model = type(instances[0])
+        meta = model._meta
+        for relation in relations:
+            if relation in meta.fk_fields or relation in meta.o2o_fields:
+                await self._load_direct(instances, relation)
+            elif relation in meta.backward_fk_fields:
+                await self._load_backward(instances, relation)
+            else:
+                # m2m rows belong to a single owner, nothing to share between instances
+                await model.fetch_for_list(instances, relation)
+
+    @staticmethod
+    def _query(related_model: Type[Model]) -> QuerySet:
+        query = related_model.all()
+        if columns := ModelSerializer.for_model(related_model).default_columns:
+            query = query.only(*columns)
+        return query
+
+    async def _load_direct(self, instances: list[Model], relation: str) -> None:
+        field = type(instances[0])._meta.fields_map[relation]
+        related_model: Type[Model] = field.related_model
+        to_field = field.to_field_instance.model_field_name
+        source_field = field.source_field
+        known = self._identity.setdefault((related_model, to_field), {})
+
+        keys = {instance.__dict__.get(source_field) for instance in instances}
+        keys.discard(None)
+        if missing := keys - known.keys():
+            for obj in await self._query(related_model).filter(**{f"{to_field}__in": missing}):
+                known[getattr(obj, to_field)] = obj
+        for instance in instances:
+            setattr(instance, f"_{relation}", known.get(instance.__dict__.get(source_field)))
+
+    async def _load_backward(self, instances: list[Model], relation: str) -> None:
+        field = type(instances[0])._meta.fields_map[relation]
+        to_field = field.to_field_instance.model_field_name
+        relation_field = field.relation_field
+
+        related: dict[Any, list[Model]] = defaultdict(list)
+        keys = {getattr(instance, to_field) for instance in instances}
+        for obj in await self._query(field.related_model).filter(**{f"{relation_field}__in": keys}):
+            related[getattr(obj, relation_field)].append(obj)
+        for instance in instances:
+            getattr(instance, relation)._set_result_for_query(related.get(getattr(instance, to_field), []))
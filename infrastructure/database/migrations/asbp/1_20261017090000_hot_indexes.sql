@@ -0,0 +1,20 @@
+-- upgrade --
+CREATE INDEX IF NOT EXISTS "idx_claim_created_bacf9c" ON "claim" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "idx_visitor_created_215f9c" ON "visitor" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "idx_strangerthi_created_5890dc" ON "strangerthings" ("created_at", "id");
+CREATE INDEX IF NOT EXISTS "visitor_claim_alive_idx" ON "visitor" ("claim_id") WHERE deleted = false;
+CREATE INDEX IF NOT EXISTS "visitor_deleted_modified_idx" ON "visitor" ("modified_at") WHERE deleted = true;
+CREATE INDEX IF NOT EXISTS "idx_visitsessio_visitor_86a95f" ON "visitsession" ("visitor_id", "exit");
+CREATE INDEX IF NOT EXISTS "idx_pass_modifie_3195f6" ON "pass" ("modified_at");
+CREATE INDEX IF NOT EXISTS "idx_claimwayapp_claim_i_eb3aa7" ON "claimwayapproval" ("claim_id", "system_user_id", "approved");
+CREATE INDEX IF NOT EXISTS "idx_parkingtime_parking_fc39ad" ON "parkingtimeslot" ("parking_place_id", "start", "end");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_parkingtime_parking_fc39ad";
+DROP INDEX IF EXISTS "idx_claimwayapp_claim_i_eb3aa7";
+DROP INDEX IF EXISTS "idx_pass_modifie_3195f6";
+DROP INDEX IF EXISTS "idx_visitsessio_visitor_86a95f";
+DROP INDEX IF EXISTS "visitor_deleted_modified_idx";
+DROP INDEX IF EXISTS "visitor_claim_alive_idx";
+DROP INDEX IF EXISTS "idx_strangerthi_created_5890dc";
+DROP INDEX IF EXISTS "idx_visitor_created_215f9c";
+DROP INDEX IF EXISTS "idx_claim_created_bacf9c";
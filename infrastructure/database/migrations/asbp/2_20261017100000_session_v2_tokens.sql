@@ -0,0 +1,9 @@
+-- upgrade --
+ALTER TABLE "systemusersession" ALTER COLUMN "salt" DROP NOT NULL;
+ALTER TABLE "systemusersession" ALTER COLUMN "nonce" DROP NOT NULL;
+ALTER TABLE "systemusersession" ALTER COLUMN "tag" DROP NOT NULL;
+-- downgrade --
+DELETE FROM "systemusersession" WHERE "salt" IS NULL OR "nonce" IS NULL OR "tag" IS NULL;
+ALTER TABLE "systemusersession" ALTER COLUMN "tag" SET NOT NULL;
+ALTER TABLE "systemusersession" ALTER COLUMN "nonce" SET NOT NULL;
+ALTER TABLE "systemusersession" ALTER COLUMN "salt" SET NOT NULL;
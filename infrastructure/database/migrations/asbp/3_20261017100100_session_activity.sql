@@ -0,0 +1,8 @@
+-- upgrade --
+ALTER TABLE "systemusersession" ADD COLUMN IF NOT EXISTS "last_online" TIMESTAMPTZ;
+CREATE INDEX IF NOT EXISTS "idx_systemusers_expire__809a17" ON "systemusersession" ("expire_time");
+CREATE INDEX IF NOT EXISTS "idx_systemusers_last_on_8a900a" ON "systemusersession" ("last_online");
+-- downgrade --
+DROP INDEX IF EXISTS "idx_systemusers_last_on_8a900a";
+DROP INDEX IF EXISTS "idx_systemusers_expire__809a17";
+ALTER TABLE "systemusersession" DROP COLUMN IF EXISTS "last_online";
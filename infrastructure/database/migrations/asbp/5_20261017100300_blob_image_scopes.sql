@@ -0,0 +1,7 @@
+-- upgrade --
+INSERT INTO "enablescope" ("name") SELECT 'blacklists/<entity:int>/<field:str>' WHERE NOT EXISTS (SELECT 1 FROM "enablescope" WHERE "name" = 'blacklists/<entity:int>/<field:str>');
+INSERT INTO "enablescope_role" ("enablescope_id", "role_id") SELECT s."id", r."id" FROM "enablescope" s, "role" r WHERE s."name" = 'blacklists/<entity:int>/<field:str>' AND r."name" IN ('root', 'Администратор') AND NOT EXISTS (SELECT 1 FROM "enablescope_role" e WHERE e."enablescope_id" = s."id" AND e."role_id" = r."id");
+INSERT INTO "enablescope" ("name") SELECT 'watermarks/<entity:int>/<field:str>' WHERE NOT EXISTS (SELECT 1 FROM "enablescope" WHERE "name" = 'watermarks/<entity:int>/<field:str>');
+INSERT INTO "enablescope_role" ("enablescope_id", "role_id") SELECT s."id", r."id" FROM "enablescope" s, "role" r WHERE s."name" = 'watermarks/<entity:int>/<field:str>' AND r."name" IN ('root', 'Администратор') AND NOT EXISTS (SELECT 1 FROM "enablescope_role" e WHERE e."enablescope_id" = s."id" AND e."role_id" = r."id");
+-- downgrade --
+DELETE FROM "enablescope" WHERE "name" IN ('blacklists/<entity:int>/<field:str>', 'watermarks/<entity:int>/<field:str>');
@@ -1,52 +1,34 @@
 from enum import Enum
-from typing import TypeVar
+from typing import TYPE_CHECKING, Iterable, Mapping, TypeVar
 
 from tortoise import fields
+from tortoise.indexes import PartialIndex
 from tortoise.models import Model
 
+from infrastructure.database.json_codec import JSONField
+from infrastructure.database.serializer import ModelSerializer
+
+if TYPE_CHECKING:
+    from infrastructure.database.loader import BatchLoader
+
 
 class AbstractBaseModel(Model):
     """Базовая модель"""
     id = fields.IntField(pk=True)
 
     async def values_dict(self, m2m_fields: bool = False, fk_fields: bool = False,
-                          backward_fk_fields: bool = False, o2o_fields: bool = False) -> dict:
-        t_d = {}
-        for k, v in self.__dict__.items():
-            if isinstance(v, bytes):
-                v = v.decode("utf-8", 'replace')
-            if not k.startswith('_'):
-                t_d.update({k: v})
-        if fk_fields:
-            for field in self._meta.fk_fields:
-                if model_attr := getattr(self, field):
-                    if model := await model_attr:
-                        t_d.update({field: await model.values_dict()})
-        if m2m_fields:
-            for field in self._meta.m2m_fields:
-                t_d.update({field: [await i.values_dict() for i in await getattr(self, field) if i]})
-                if m2m_fields:
-                    for field in self._meta.m2m_fields:
-                        models = getattr(self, field)
-                        if not models._fetched:
-                            if not m2m_fields:
-                                continue
-                            models = await models
-                        t_d.update({field: [await i.values_dict() for i in models if i]})
-        if backward_fk_fields:
-            for field in self._meta.backward_fk_fields:
-                model = getattr(self, field)
-                if isinstance(model, fields.ReverseRelation):
-                    model = await model.all()
-                if model:
-                    t_d.update({field: [await i.values_dict() for i in model if i]})
-        if o2o_fields:
-            for field in self._meta.o2o_fields:
-                if model_attr := getattr(self, field):
-                    if model := await model_attr:
-                        t_d.update({field: await model.values_dict()})
-
-        return t_d
+                          backward_fk_fields: bool = False, o2o_fields: bool = False,
+                          loader: "BatchLoader | None" = None, expand: Iterable[str] | None = None,
+                          limits: Mapping[str, int] | None = None) -> dict:
+        """
+        Для списков используйте dump_models(): связи загружаются одним запросом на весь список.
+        limits ограничивает обратные связи: {"связь": n} -> {"items": [...], "has_more": bool}
+        """
+        rows = await ModelSerializer.for_model(type(self)).dump_many(
+            [self], m2m_fields=m2m_fields, fk_fields=fk_fields,
+            backward_fk_fields=backward_fk_fields, o2o_fields=o2o_fields, loader=loader, expand=expand,
+            limits=limits)
+        return rows[0]
 
     class Meta:
         abstract = True
@@ -112,13 +94,15 @@ class SystemUserSession(AbstractBaseModel):
     user: fields.ForeignKeyNullableRelation["SystemUser"] = fields.ForeignKeyField(
         "asbp.SystemUser", null=True, on_delete=fields.CASCADE
     )
-    expire_time = fields.DatetimeField()
+    expire_time = fields.DatetimeField(index=True)
     created_at = fields.DatetimeField(auto_now_add=True, null=True)
+    last_online = fields.DatetimeField(null=True, index=True)
     logout_time = fields.DatetimeField(null=True)
     user_agent = fields.TextField(null=True)
-    salt = fields.TextField()
-    nonce = fields.TextField()
-    tag = fields.TextField()
+    # Only v1 tokens need these, v2 tokens are verified with TokenSigner
+    salt = fields.TextField(null=True)
+    nonce = fields.TextField(null=True)
+    tag = fields.TextField(null=True)
 
 
 class Role(AbstractBaseModel, TimestampMixin):
@@ -206,6 +190,16 @@ class Visitor(AbstractBaseModel, TimestampMixin, FakeDeleted):
     def __str__(self) -> str:
         return f"{self.last_name} {self.first_name} {self.middle_name}"
 
+    class Meta:
+        indexes = (
+            # Курсорная пагинация ?after=
+            ("created_at", "id"),
+            # Посетители заявки среди неудаленных
+            PartialIndex(fields=["claim_id"], condition={"deleted": False}, name="visitor_claim_alive_idx"),
+            # Архивация удаленных посетителей по modified_at
+            PartialIndex(fields=["modified_at"], condition={"deleted": True}, name="visitor_deleted_modified_idx"),
+        )
+
 
 class VisitSession(AbstractBaseModel, TimestampMixin):
     """Время посещения"""
@@ -215,6 +209,10 @@ class VisitSession(AbstractBaseModel, TimestampMixin):
     enter = fields.DatetimeField(description='Зашел на территорию', null=True)
     exit = fields.DatetimeField(description='Вышел с территории', null=True)
 
+    class Meta:
+        # Последний выход посетителя: filter(visitor=...).order_by("-exit")
+        indexes = (("visitor", "exit"),)
+
 
 class Passport(AbstractBaseModel, TimestampMixin):
     """Данные паспорта"""
@@ -299,7 +297,7 @@ class WatermarkPosition(Enum):
 
 class VisitorPhoto(AbstractBaseModel, TimestampMixin):
     """Фото посетителя"""
-    signature = fields.JSONField(null=True)
+    signature = JSONField(null=True)
     webcam_img = fields.BinaryField(null=True, description='Фото с веб-камеры')
     scan_img = fields.BinaryField(null=True, description='Скан документа')
     car_number_img = fields.BinaryField(null=True, description='Фото номера транспорта')
@@ -419,6 +417,10 @@ class Claim(AbstractBaseModel, TimestampMixin):
     visitors: fields.ReverseRelation["Visitor"]
     claim_way_approval: fields.ReverseRelation["ClaimWayApproval"]
 
+    class Meta:
+        # Курсорная пагинация ?after=
+        indexes = (("created_at", "id"),)
+
 
 class Pass(AbstractBaseModel, TimestampMixin):
     """Пропуск"""
@@ -434,6 +436,10 @@ class Pass(AbstractBaseModel, TimestampMixin):
     def __str__(self) -> str:
         return f"{self.rfid}"
 
+    class Meta:
+        # Архивация по modified_at
+        indexes = (("modified_at",),)
+
 
 class ClaimWay(AbstractBaseModel, TimestampMixin):
     """Маршрут согласования заявки"""
@@ -462,6 +468,10 @@ class ClaimWayApproval(AbstractBaseModel, TimestampMixin):
     def __str__(self):
         return f"User:{self.system_user}, Claim:{self.claim} - {self.approved}"
 
+    class Meta:
+        # Одобрение пользователя по заявке и неодобрившие пользователи заявки
+        indexes = (("claim", "system_user", "approved"),)
+
 
 class Zone(AbstractBaseModel, TimestampMixin):
     """Зоны доступа, разрешенные для посещения"""
@@ -538,6 +548,10 @@ class ParkingTimeslot(AbstractBaseModel, TimestampMixin):
         'asbp.Transport', on_delete=fields.CASCADE, related_name='parking_timeslot'
     )
 
+    class Meta:
+        # Пересечение интервалов на парковочном месте
+        indexes = (("parking_place", "start", "end"),)
+
 
 # ------------------------------------SYSTEM---------------------------------
 
@@ -581,18 +595,18 @@ class SystemSettings(AbstractBaseModel, TimestampMixin):
                                                                          "нахождения гостевого автомобиля на парковке.")
     parking_timeslot_interval = fields.SmallIntField(default=0, description="Интервал в минутах для "
                                                                             "бронирования машиноместа на парковке.")
-    visitor_middle_name = fields.JSONField(description="Поле посетитель", null=True)
-    visitor_company_name = fields.JSONField(description="Название организации", null=True)
-    visitor_attribute = fields.JSONField(description="Иностранный гражданин", null=True)
-    visitor_date_of_birth = fields.JSONField(description="Дата рождения", null=True)
-    pass_type = fields.JSONField(description='Тип пропуска', null=True)
-    pass_valid_till_date = fields.JSONField(description='До какого числа действует пропуск', null=True)
-    transport_model = fields.JSONField(description="Модель", null=True)
-    transport_number = fields.JSONField(description='Регистрационный номер', null=True)
-    transport_color = fields.JSONField(description='Цвет', null=True)
-    document = fields.JSONField(description="Документ", null=True)
-    document_number = fields.JSONField(description="Реквизиты документа", null=True)
-    document_registration = fields.JSONField(description="Место регистрации", null=True)
+    visitor_middle_name = JSONField(description="Поле посетитель", null=True)
+    visitor_company_name = JSONField(description="Название организации", null=True)
+    visitor_attribute = JSONField(description="Иностранный гражданин", null=True)
+    visitor_date_of_birth = JSONField(description="Дата рождения", null=True)
+    pass_type = JSONField(description='Тип пропуска', null=True)
+    pass_valid_till_date = JSONField(description='До какого числа действует пропуск', null=True)
+    transport_model = JSONField(description="Модель", null=True)
+    transport_number = JSONField(description='Регистрационный номер', null=True)
+    transport_color = JSONField(description='Цвет', null=True)
+    document = JSONField(description="Документ", null=True)
+    document_number = JSONField(description="Реквизиты документа", null=True)
+    document_registration = JSONField(description="Место регистрации", null=True)
 
 
 class StrangerThings(AbstractBaseModel, TimestampMixin):
@@ -600,17 +614,21 @@ class StrangerThings(AbstractBaseModel, TimestampMixin):
     system_user: fields.ForeignKeyRelation["SystemUser"] = fields.ForeignKeyField(
         "asbp.SystemUser", on_delete=fields.CASCADE, index=True, related_name='stranger_things'
     )
-    fio_changed = fields.JSONField(null=True, description="изменение ФИО посетителя при выдаче пропуска")
-    data_changed = fields.JSONField(null=True, description="редактирование данных посетителя после его визита")
-    pass_to_black_list = fields.JSONField(null=True, description="оформление пропуска на посетителя из 'ЧС'")
-    claim_way_changed = fields.JSONField(null=True, description="изменение маршрутов заявок")
-    max_parking_time_hours = fields.JSONField(null=True, description="Превышено максимально допустимое время "
-                                                                     "нахождения гостевого автомобиля на парковке")
+    fio_changed = JSONField(null=True, description="изменение ФИО посетителя при выдаче пропуска")
+    data_changed = JSONField(null=True, description="редактирование данных посетителя после его визита")
+    pass_to_black_list = JSONField(null=True, description="оформление пропуска на посетителя из 'ЧС'")
+    claim_way_changed = JSONField(null=True, description="изменение маршрутов заявок")
+    max_parking_time_hours = JSONField(null=True, description="Превышено максимально допустимое время "
+                                                              "нахождения гостевого автомобиля на парковке")
+
+    class Meta:
+        # Курсорная пагинация ?after=
+        indexes = (("created_at", "id"),)
 
 
 class PushSubscription(AbstractBaseModel, TimestampMixin):
     """Web Push подписка"""
-    subscription_info = fields.JSONField(description="Информация для отправки push-сообщений этому пользователю")
+    subscription_info = JSONField(description="Информация для отправки push-сообщений этому пользователю")
     system_user: fields.ForeignKeyRelation["SystemUser"] = fields.ForeignKeyField(
         "asbp.SystemUser", on_delete=fields.CASCADE, index=True, related_name='push_subscription'
     )
@@ -0,0 +1,261 @@
+"""
+Tortoise engine "infrastructure.database.pool": asyncpg client whose pool exports its state to Prometheus.
+Credentials are those of tortoise.backends.asyncpg plus acquire_timeout and alias_of, the rest goes to
+asyncpg.create_pool().
+
+A connection may have extra pools per workload class, "<connection>.<workload>" in config.db_pools.
+Code running in_workload() / @workload() queries the connection through the pool of its workload,
+so bulk jobs and reports do not take connections of the interactive requests.
+"<connection>.replica" is a read replica, read-only methods decorated with @replica_read go there
+when the request allows it, see core.server.replica.
+
+Statements of a request are limited by statement_timeout of its controller (STATEMENT_TIMEOUT):
+inside a transaction with SET LOCAL statement_timeout, outside of it with the asyncpg timeout of the call,
+a session-wide SET would stay on the connection for the next user of the pool.
+"""
+import asyncio
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from time import monotonic
+from typing import (Any, AsyncContextManager, AsyncIterator, Callable,
+                    Iterator, TypeVar)
+
+import asyncpg
+from prometheus_client import Counter, Gauge, Histogram
+from tortoise import connections
+from tortoise.backends.asyncpg import AsyncpgDBClient
+from tortoise.backends.asyncpg.client import TransactionWrapper
+from tortoise.backends.base.client import (BaseTransactionWrapper,
+                                           TransactionContext,
+                                           TransactionContextPooled)
+
+import settings
+from core.utils.loggining import logger
+from infrastructure.database.json_codec import register_json_codecs
+from infrastructure.database.prepared import PreparedConnection, PreparedStatements
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+REPLICA = "replica"
+# Set per request by core.server.replica, reads stay on the primary outside of requests
+REPLICA_READS: ContextVar[bool] = ContextVar("replica_reads", default=False)
+# Seconds, set per request by core.server.timeouts from statement_timeout of the controller
+STATEMENT_TIMEOUT: ContextVar[float | None] = ContextVar("statement_timeout", default=None)
+
+DB_POOL_CONNECTIONS = Gauge("db_pool_connections",
+                            "Connections of the pool: open, idle, in use and the maximum", ["connection", "state"],
+                            multiprocess_mode="livesum")
+DB_POOL_WAITING = Gauge("db_pool_waiting",
+                        "Acquires waiting for a free connection", ["connection"], multiprocess_mode="livesum")
+DB_POOL_ACQUIRE_SECONDS = Histogram("db_pool_acquire_seconds",
+                                    "Time spent waiting for a connection of the pool", ["connection"],
+                                    buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10))
+DB_POOL_ACQUIRE_TIMEOUTS = Counter("db_pool_acquire_timeouts",
+                                   "Acquires which did not get a connection within acquire_timeout", ["connection"])
+DB_STATEMENTS_CANCELLED = Counter("db_statements_cancelled",
+                                  "Statements cancelled on the server: timed out or abandoned by a cancelled task "
+                                  "(client disconnect)", ["reason"])
+
+
+@contextmanager
+def _cancellations() -> Iterator[None]:
+    try:
+        yield
+    except asyncio.CancelledError:
+        DB_STATEMENTS_CANCELLED.labels("abandoned").inc()
+        raise
+    except (asyncio.TimeoutError, asyncpg.QueryCanceledError):
+        DB_STATEMENTS_CANCELLED.labels("timeout").inc()
+        raise
+
+
+class PoolConnection(PreparedConnection):
+    """
+    Connection of the pools with STATEMENT_TIMEOUT. asyncpg cancels the statement on the server
+    when the call times out or its task is cancelled, Sanic cancels the task of a request when the client goes away.
+    """
+    __slots__ = ()
+
+    def call_timeout(self, timeout: float | None = None) -> float | None:
+        """The explicit timeout or STATEMENT_TIMEOUT, unless the transaction has it set already."""
+        if timeout is not None or self.is_in_transaction():
+            return timeout
+        if (statement_timeout := STATEMENT_TIMEOUT.get()) is None:
+            return None
+        command_timeout = self._config.command_timeout
+        return statement_timeout if command_timeout is None else min(statement_timeout, command_timeout)
+
+    async def execute(self, query: str, *args: Any, timeout: float | None = None) -> str:
+        if args:
+            # Goes through _execute()
+            return await super().execute(query, *args, timeout=timeout)
+        with _cancellations():
+            return await super().execute(query, timeout=self.call_timeout(timeout))
+
+    async def _execute(self, query: str, args: Any, limit: int, timeout: float | None, **kwargs: Any) -> Any:
+        with _cancellations():
+            return await super()._execute(query, args, limit, self.call_timeout(timeout), **kwargs)
+
+    async def _executemany(self, query: str, args: Any, timeout: float | None) -> Any:
+        with _cancellations():
+            return await super()._executemany(query, args, self.call_timeout(timeout))
+
+
+class InstrumentedPool(asyncpg.Pool):
+    """asyncpg.Pool with acquire_timeout by default and acquire metrics."""
+    __slots__ = ("_name", "_acquire_timeout")
+
+    def __init__(self, *args: Any, name: str, acquire_timeout: float | None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._name = name
+        self._acquire_timeout = acquire_timeout
+        DB_POOL_CONNECTIONS.labels(name, "max").set(self.get_max_size())
+
+    def _report_size(self) -> None:
+        # Set explicitly, samples of set_function() are not shared between workers in multiprocess mode
+        size, idle = self.get_size(), self.get_idle_size()
+        DB_POOL_CONNECTIONS.labels(self._name, "open").set(size)
+        DB_POOL_CONNECTIONS.labels(self._name, "idle").set(idle)
+        DB_POOL_CONNECTIONS.labels(self._name, "in_use").set(size - idle)
+
+    async def _acquire(self, timeout: float | None):
+        waiting = DB_POOL_WAITING.labels(self._name)
+        waiting.inc()
+        started_at = monotonic()
+        try:
+            return await super()._acquire(self._acquire_timeout if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            DB_POOL_ACQUIRE_TIMEOUTS.labels(self._name).inc()
+            raise
+        finally:
+            waiting.dec()
+            DB_POOL_ACQUIRE_SECONDS.labels(self._name).observe(monotonic() - started_at)
+            self._report_size()
+
+    async def release(self, connection: asyncpg.Connection, *, timeout: float | None = None) -> None:
+        try:
+            await super().release(connection, timeout=timeout)
+        finally:
+            self._report_size()
+
+    async def close(self) -> None:
+        await super().close()
+        # Closed pools of setup_db stay in the live sums of the main process otherwise
+        DB_POOL_CONNECTIONS.labels(self._name, "max").set(0)
+        self._report_size()
+
+
+class TimeoutTransactionWrapper(TransactionWrapper):
+    """Transaction with SET LOCAL statement_timeout of STATEMENT_TIMEOUT, the setting ends with the transaction."""
+    decodes_json = True
+
+    async def start(self) -> None:
+        await super().start()
+        if (timeout := STATEMENT_TIMEOUT.get()) is not None:
+            await self._connection.execute(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
+
+
+class InstrumentedAsyncpgDBClient(AsyncpgDBClient):
+    connection_class = PoolConnection
+    # json/jsonb come decoded by infrastructure.database.json_codec
+    decodes_json = True
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.acquire_timeout: float | None = self.extra.pop("acquire_timeout", None)
+        self.pool_name = self.connection_name
+        # A workload pool stands for its connection: transactions opened on it are set under that alias
+        self.connection_name = self.extra.pop("alias_of", None) or self.connection_name
+
+    async def create_pool(self, **kwargs: Any) -> asyncpg.Pool:
+        # Defaults of asyncpg.create_pool(), which has no way to pass a Pool class
+        kwargs.setdefault("max_queries", 50000)
+        kwargs.setdefault("max_inactive_connection_lifetime", 300.0)
+        kwargs.setdefault("record_class", asyncpg.Record)
+        return await InstrumentedPool(None, name=self.pool_name, acquire_timeout=self.acquire_timeout,
+                                      setup=None, init=self._init_connection, **kwargs)
+
+    def _in_transaction(self) -> TransactionContext:
+        return TransactionContextPooled(TimeoutTransactionWrapper(self))
+
+    async def _init_connection(self, connection: PoolConnection) -> None:
+        await register_json_codecs(connection)
+        await PreparedStatements.prepare_all(self.connection_name, connection)
+
+    async def warm_up(self) -> None:
+        """Opens the pool and checks its min_size connections with SELECT 1."""
+        if self._pool is None:
+            await self.create_connection(with_db=True)
+
+        async def ping():
+            async with self._pool.acquire() as connection:
+                await connection.fetchval("SELECT 1")
+
+        await asyncio.gather(*(ping() for _ in range(self.pool_minsize)))
+        logger.info(f"Database pool {self.pool_name}: {self._pool.get_size()} of "
+                    f"{self._pool.get_max_size()} connections ready")
+
+
+client_class = InstrumentedAsyncpgDBClient
+
+
+async def warm_up_pools(*_: Any) -> None:
+    """before_server_start listener, goes after Tortoise is initialized."""
+    await asyncio.gather(*(connection.warm_up() for connection in connections.all()
+                           if isinstance(connection, InstrumentedAsyncpgDBClient)))
+
+
+class Workload:
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+    REPORTING = "reporting"
+
+
+@asynccontextmanager
+async def in_workload(workload: str, connection_name: str = settings.CONNECTION_NAME) -> AsyncIterator[None]:
+    """
+    Queries of connection_name go through the pool of workload inside the block.
+    Interactive is the connection's own pool. Without a configured pool or inside a transaction
+    the current connection is kept.
+    """
+    alias = f"{connection_name}.{workload}"
+    current = connections.get(connection_name)
+    if alias not in connections.db_config or isinstance(current, BaseTransactionWrapper):
+        yield
+        return
+    token = connections.set(connection_name, connections.get(alias))
+    try:
+        yield
+    finally:
+        connections.reset(token)
+
+
+def workload(name: str, connection_name: str = settings.CONNECTION_NAME) -> Callable[[F], F]:
+    """in_workload() for the whole call, goes above @atomic so the transaction is taken from the pool of name."""
+    def wrapper(func: F) -> F:
+        @wraps(func)
+        async def wrapped(*args: Any, **kwargs: Any) -> Any:
+            async with in_workload(name, connection_name):
+                return await func(*args, **kwargs)
+
+        return wrapped
+
+    return wrapper
+
+
+def in_replica(connection_name: str = settings.CONNECTION_NAME) -> AsyncContextManager[None]:
+    """Queries of connection_name go to its replica inside the block, if there is one and the request allows it."""
+    if REPLICA_READS.get():
+        return in_workload(REPLICA, connection_name)
+    return nullcontext()
+
+
+def replica_read(func: F) -> F:
+    """For read-only methods, they must not write: the replica is a hot standby."""
+    @wraps(func)
+    async def wrapped(*args: Any, **kwargs: Any) -> Any:
+        async with in_replica():
+            return await func(*args, **kwargs)
+
+    return wrapped
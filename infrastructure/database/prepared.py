@@ -0,0 +1,188 @@
+"""
+Prepared statements for the queries which run on almost every request: auth lookups, black list checks,
+system settings. They skip Tortoise query building and asyncpg's statement cache lookup.
+
+Statements are prepared on every new connection of an infrastructure.database.pool client
+(asyncpg pool init) and kept on the connection, connections of other clients prepare them on first use.
+On other databases and drivers the ORM fallback of the query runs instead.
+"""
+from typing import Any, Awaitable, Callable, Generic, Type, TypeVar
+
+import asyncpg
+from tortoise import Model, connections
+from tortoise.backends.asyncpg import AsyncpgDBClient
+
+from core.utils.loggining import logger
+from infrastructure.database.models import (BlackList, Pass, SystemSettings,
+                                            SystemUser, SystemUserSession)
+
+T = TypeVar("T")
+
+
+class PreparedConnection(asyncpg.Connection):
+    """asyncpg connection which keeps its prepared statements by query name."""
+    __slots__ = ("prepared",)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.prepared: dict[str, asyncpg.prepared_stmt.PreparedStatement] = {}
+
+    def call_timeout(self, timeout: float | None = None) -> float | None:
+        """Timeout of a statement call, prepared statements are called past execute() and fetch()."""
+        return timeout
+
+
+class PreparedQuery(Generic[T]):
+    """
+    Named statement of model's connection. build() renders the SQL from model metadata,
+    which is complete only after Tortoise.init(), decode() turns the row (or None) into the result.
+    """
+    __slots__ = ("name", "model", "build", "decode", "fallback", "_sql")
+
+    def __init__(self, name: str, model: Type[Model], build: Callable[[], str],
+                 decode: Callable[[asyncpg.Record | None], T], fallback: Callable[..., Awaitable[T]]):
+        self.name = name
+        self.model = model
+        self.build = build
+        self.decode = decode
+        self.fallback = fallback
+        self._sql: str | None = None
+
+    @property
+    def sql(self) -> str:
+        if self._sql is None:
+            self._sql = self.build()
+        return self._sql
+
+    async def prepare(self, connection: PreparedConnection) -> asyncpg.prepared_stmt.PreparedStatement:
+        statement = connection.prepared[self.name] = await connection.prepare(self.sql)
+        return statement
+
+    async def fetch(self, *args: Any) -> T:
+        client = connections.get(self.model._meta.default_connection)
+        if not isinstance(client, AsyncpgDBClient):
+            return await self.fallback(*args)
+        # Inside a transaction client is its TransactionWrapper and this is the connection of the transaction:
+        # the lookup sees its uncommitted rows and takes no second connection from the pool
+        async with client.acquire_connection() as connection:
+            # Pool connections are proxies, attributes of the connection are reachable through them
+            if (prepared := getattr(connection, "prepared", None)) is None:
+                return self.decode(await connection.fetchrow(self.sql, *args))
+            if (statement := prepared.get(self.name)) is None:
+                statement = await self.prepare(connection)
+            return self.decode(await statement.fetchrow(*args, timeout=connection.call_timeout()))
+
+
+class PreparedStatements:
+    _queries: dict[str, PreparedQuery] = {}
+
+    @classmethod
+    def register(cls, query: PreparedQuery[T]) -> PreparedQuery[T]:
+        assert query.name not in cls._queries, f"Prepared query {query.name} is registered twice"
+        cls._queries[query.name] = query
+        return query
+
+    @classmethod
+    def get(cls, name: str) -> PreparedQuery:
+        return cls._queries[name]
+
+    @classmethod
+    async def prepare_all(cls, connection_name: str, connection: PreparedConnection) -> None:
+        """asyncpg pool init callback, a statement which fails to prepare is retried on first use."""
+        for query in cls._queries.values():
+            if query.model._meta.default_connection != connection_name:
+                continue
+            try:
+                await query.prepare(connection)
+            except asyncpg.PostgresError as ex:
+                logger.warning(f"Failed to prepare {query.name}: {ex}")
+
+
+def _table(model: Type[Model]) -> str:
+    return f'"{model._meta.db_table}"'
+
+
+def _columns(model: Type[Model], alias: str = "") -> str:
+    prefix = f"{alias}." if alias else ""
+    return ", ".join(f'{prefix}"{column}" AS "{field}"'
+                     for field, column in model._meta.fields_db_projection.items())
+
+
+def _model(model: Type[Model]) -> Callable[[asyncpg.Record | None], Model | None]:
+    def decode(row: asyncpg.Record | None) -> Model | None:
+        return None if row is None else model._init_from_db(**row)
+
+    return decode
+
+
+def _first(row: asyncpg.Record | None) -> Any:
+    return None if row is None else row[0]
+
+
+def _user_with_scopes_sql() -> str:
+    scopes = SystemUser._meta.fields_map["scopes"]
+    role = scopes.related_model
+    return (f'SELECT {_columns(SystemUser, "u")}, ARRAY(SELECT r."name" FROM {_table(role)} r '
+            f'JOIN "{scopes.through}" s ON s."{scopes.forward_key}" = r."id" '
+            f'WHERE s."{scopes.backward_key}" = u."id") AS "__scopes" '
+            f'FROM {_table(SystemUser)} u WHERE u."id" = $1')
+
+
+def _decode_user_with_scopes(row: asyncpg.Record | None) -> tuple[SystemUser, list[str]] | None:
+    if row is None:
+        return None
+    row = dict(row)
+    scopes = row.pop("__scopes")
+    return SystemUser._init_from_db(**row), scopes
+
+
+async def _orm_user_with_scopes(user_id: int) -> tuple[SystemUser, list[str]] | None:
+    user = await SystemUser.get_or_none(id=user_id).prefetch_related("scopes")
+    return None if user is None else (user, [scope.name for scope in user.scopes])
+
+
+async def _orm_system_setting(column: str) -> Any:
+    model = await SystemSettings.get_or_none(id=1).only(column)
+    return None if model is None else getattr(model, column)
+
+
+SESSION_BY_ID: PreparedQuery[SystemUserSession | None] = PreparedStatements.register(PreparedQuery(
+    "session_by_id", SystemUserSession,
+    lambda: f'SELECT {_columns(SystemUserSession)} FROM {_table(SystemUserSession)} WHERE "id" = $1',
+    _model(SystemUserSession),
+    lambda session_id: SystemUserSession.get_or_none(id=session_id),
+))
+
+USER_WITH_SCOPES: PreparedQuery[tuple[SystemUser, list[str]] | None] = PreparedStatements.register(PreparedQuery(
+    "user_with_scopes", SystemUser, _user_with_scopes_sql, _decode_user_with_scopes, _orm_user_with_scopes,
+))
+
+PASS_RFID_EXISTS: PreparedQuery[bool] = PreparedStatements.register(PreparedQuery(
+    "pass_rfid_exists", Pass,
+    lambda: f'SELECT EXISTS(SELECT 1 FROM {_table(Pass)} WHERE "rfid" = $1)',
+    _first,
+    lambda rfid: Pass.exists(rfid=rfid),
+))
+
+BLACKLIST_EXISTS: PreparedQuery[bool] = PreparedStatements.register(PreparedQuery(
+    "blacklist_exists", BlackList,
+    lambda: f'SELECT EXISTS(SELECT 1 FROM {_table(BlackList)} WHERE "visitor_id" = $1)',
+    _first,
+    lambda visitor_id: BlackList.exists(visitor_id=visitor_id),
+))
+
+
+def _system_setting(field: str) -> PreparedQuery:
+    column = SystemSettings._meta.fields_map[field].source_field or field
+    return PreparedStatements.register(PreparedQuery(
+        f"system_settings.{field}", SystemSettings,
+        lambda: f'SELECT "{column}" FROM {_table(SystemSettings)} WHERE "id" = 1',
+        # JSON columns are decoded by the connection's codec, text from other connections by the field
+        lambda row: None if row is None else SystemSettings._meta.fields_map[field].to_python_value(row[0]),
+        lambda: _orm_system_setting(field),
+    ))
+
+
+SYSTEM_SETTINGS: dict[str, PreparedQuery] = {
+    field: _system_setting(field) for field in SystemSettings._meta.db_fields if field not in ("id",)
+}
@@ -0,0 +1,90 @@
+from typing import Any, Iterable, Literal, Mapping, NamedTuple, Type
+
+from tortoise import Model, Tortoise
+from tortoise.queryset import QuerySet
+
+from infrastructure.database.loader import BatchLoader
+from infrastructure.database.serializer import ModelSerializer
+
+JOIN = "join"
+PREFETCH = "prefetch"
+SKIP = "skip"
+Loading = Literal["join", "prefetch", "skip"]
+
+
+class RelationMeta:
+    """
+    Relations of a model, taken from Model._meta once.
+    To-one relations are joined unless the related model has blob columns: a join selects every column,
+    BatchLoader leaves blobs out.
+    """
+    __slots__ = ("model", "to_one", "to_many", "joinable", "source_fields")
+    _registry: dict[Type[Model], "RelationMeta"] = {}
+
+    def __init__(self, model: Type[Model]):
+        meta = model._meta
+        self.model = model
+        self.to_one = tuple(sorted(meta.fk_fields | meta.o2o_fields))
+        self.to_many = tuple(sorted(meta.m2m_fields | meta.backward_fk_fields | meta.backward_o2o_fields))
+        self.joinable = frozenset(
+            relation for relation in self.to_one
+            if ModelSerializer.for_model(meta.fields_map[relation].related_model).default_columns is None
+        )
+        self.source_fields = {relation: meta.fields_map[relation].source_field for relation in self.to_one}
+
+    @classmethod
+    def for_model(cls, model: Type[Model]) -> "RelationMeta":
+        relations = cls._registry.get(model)
+        if relations is None:
+            relations = cls._registry[model] = cls(model)
+        return relations
+
+    @classmethod
+    async def build(cls, *_: Any) -> None:
+        """before_server_start listener, goes after Tortoise is initialized: relations are resolved by then."""
+        cls._registry.clear()
+        for app in Tortoise.apps.values():
+            for model in app.values():
+                cls.for_model(model)
+
+
+class QueryPlan(NamedTuple):
+    join: tuple[str, ...] = ()
+    prefetch: tuple[str, ...] = ()
+
+    def apply(self, query: QuerySet) -> QuerySet:
+        return query.select_related(*self.join) if self.join else query
+
+    async def load(self, instances: list[Model], loader: BatchLoader | None = None) -> None:
+        """Prefetched relations, one query per relation for the whole list."""
+        if self.prefetch and instances:
+            await (loader or BatchLoader()).load(instances, *self.prefetch)
+
+
+def plan_relations(model: Type[Model], relations: Iterable[str] | None = None,
+                   overrides: Mapping[str, Loading] | None = None,
+                   fields: Iterable[str] | None = None) -> QueryPlan:
+    """
+    How to load relations of model (all of them if None): to-one ones by select_related() joins,
+    to-many ones by batched prefetch. overrides of the endpoint take precedence, a to-many relation can't be joined.
+    With fields, a to-one relation whose key column is not selected can't be loaded and is skipped.
+    """
+    meta = RelationMeta.for_model(model)
+    relations = meta.to_one + meta.to_many if relations is None else relations
+    overrides = overrides or {}
+    fields = set(fields) if fields else None
+    join, prefetch = [], []
+    for relation in relations:
+        is_to_one = relation in meta.source_fields
+        if not is_to_one and relation not in meta.to_many:
+            continue
+        if is_to_one and fields is not None and meta.source_fields[relation] not in fields:
+            continue
+        match overrides.get(relation, JOIN if relation in meta.joinable else PREFETCH):
+            case "join" if is_to_one:
+                join.append(relation)
+            case "skip":
+                pass
+            case _:
+                prefetch.append(relation)
+    return QueryPlan(tuple(join), tuple(prefetch))
@@ -0,0 +1,191 @@
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Iterable, Mapping, Type
+
+from tortoise import Model, fields
+
+if TYPE_CHECKING:
+    from infrastructure.database.loader import BatchLoader
+
+
+class ModelSerializer:
+    """
+    Serializer compiled once per model class.
+    Field list, bytes/enum fields and relations are taken from Model._meta at compile time,
+    so dumping a row is a plain loop over precomputed names.
+    Missing relations are fetched for the whole list at once, dumping itself never awaits.
+    """
+    __slots__ = ("model", "fields", "bytes_fields", "default_columns", "enum_fields",
+                 "fk_fields", "o2o_fields", "m2m_fields", "backward_fk_fields", "source_fields",
+                 "default_converters", "complex_converters")
+    _compiled: dict[Type[Model], "ModelSerializer"] = {}
+
+    def __init__(self, model: Type[Model]):
+        meta = model._meta
+        self.model = model
+        self.fields = tuple(meta.fields_db_projection)
+        self.bytes_fields = tuple(name for name in self.fields
+                                  if isinstance(meta.fields_map[name], fields.BinaryField))
+        # Blobs are deferred on read paths, they are served by their own endpoints
+        self.default_columns = tuple(name for name in self.fields
+                                     if name not in self.bytes_fields) if self.bytes_fields else None
+        self.enum_fields = tuple(name for name in self.fields
+                                 if getattr(meta.fields_map[name], "enum_type", None) is not None)
+        self.fk_fields = tuple(sorted(meta.fk_fields))
+        self.o2o_fields = tuple(sorted(meta.o2o_fields))
+        self.m2m_fields = tuple(sorted(meta.m2m_fields))
+        self.backward_fk_fields = tuple(sorted(meta.backward_fk_fields))
+        self.source_fields = {name: meta.fields_map[name].source_field for name in self.fk_fields + self.o2o_fields}
+        # Conversions _init_from_db() applies to values of the driver, needed to dump raw rows the same way.
+        # Enum values are dumped as they are stored
+        self.default_converters = tuple((name, field.field_type) for _, name, field in meta.db_default_fields)
+        self.complex_converters = tuple((name, field.field_type, field.to_python_value)
+                                        for _, name, field in meta.db_complex_fields if name not in self.enum_fields)
+
+    @classmethod
+    def for_model(cls, model: Type[Model]) -> "ModelSerializer":
+        serializer = cls._compiled.get(model)
+        if serializer is None:
+            serializer = cls._compiled[model] = cls(model)
+        return serializer
+
+    def columns(self, fields: Iterable[str] | None = None) -> tuple[str, ...]:
+        """Projection of a read: fields if given, otherwise every column except blobs."""
+        return tuple(fields) if fields else self.default_columns or self.fields
+
+    def _encode(self, result: dict[str, Any]) -> dict[str, Any]:
+        for name in self.bytes_fields:
+            if (value := result.get(name)) is not None:
+                result[name] = value.decode("utf-8", "replace")
+        for name in self.enum_fields:
+            if isinstance(value := result.get(name), Enum):
+                result[name] = value.value
+        return result
+
+    def to_dict(self, instance: Model) -> dict[str, Any]:
+        """Own fields only, the same as values_dict() without relations."""
+        values = instance.__dict__
+        if instance._partial:
+            result = {name: values[name] for name in self.fields if name in values}
+        else:
+            result = {name: values[name] for name in self.fields}
+        return self._encode(result)
+
+    def dump_records(self, records: Iterable[Mapping[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Rows of DbLayer.fetch_records() dumped like to_dict() but without model instances.
+        Keys of a record are field names, only own fields are dumped.
+        Values the driver has already decoded are kept: aware datetimes of asyncpg stay in UTC
+        instead of Tortoise's timezone, which is the same instant and the same local time in JSON.
+        """
+        rows = []
+        for record in records:
+            result = dict(record)
+            for name, field_type in self.default_converters:
+                if (value := result.get(name)) is not None:
+                    result[name] = field_type(value)
+            for name, field_type, to_python_value in self.complex_converters:
+                if (value := result.get(name)) is not None and not isinstance(value, field_type):
+                    result[name] = to_python_value(value)
+            rows.append(self._encode(result))
+        return rows
+
+    def _relations(self, m2m_fields: bool, fk_fields: bool, backward_fk_fields: bool, o2o_fields: bool,
+                   expand: Iterable[str] | None) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """Relation plan: (single object relations, collection relations)."""
+        if expand is not None:
+            single = tuple(field for field in expand if field in self.fk_fields or field in self.o2o_fields)
+            many = tuple(field for field in expand if field in self.m2m_fields or field in self.backward_fk_fields)
+            return single, many
+        single = (self.fk_fields if fk_fields else ()) + (self.o2o_fields if o2o_fields else ())
+        many = (self.m2m_fields if m2m_fields else ()) + (self.backward_fk_fields if backward_fk_fields else ())
+        return single, many
+
+    @staticmethod
+    def _is_fetched(instance: Model, field: str, many: bool) -> bool:
+        cached = instance.__dict__.get(f"_{field}", ...)
+        if cached is ...:
+            return False
+        return cached._fetched if many else True
+
+    async def _load_bounded(self, instances: list[Model], relation: str, limit: int) -> set[int]:
+        """
+        First limit rows of a backward relation, ordered by (created_at, id) when the related model has it.
+        One query per instance, meant for detail responses. Returns id() of the instances that have more rows.
+        """
+        field = self.model._meta.fields_map[relation]
+        related_model: Type[Model] = field.related_model
+        to_field = field.to_field_instance.model_field_name
+        query = related_model.all()
+        if columns := self.for_model(related_model).default_columns:
+            query = query.only(*columns)
+        ordering = ("created_at", "id") if "created_at" in related_model._meta.fields_map else ("id",)
+        query = query.order_by(*ordering).limit(limit + 1)
+        truncated = set()
+        for instance in instances:
+            related = await query.filter(**{field.relation_field: getattr(instance, to_field)})
+            if len(related) > limit:
+                truncated.add(id(instance))
+                related = related[:limit]
+            getattr(instance, relation)._set_result_for_query(related)
+        return truncated
+
+    async def dump_many(self, instances: list[Model], m2m_fields: bool = False, fk_fields: bool = False,
+                        backward_fk_fields: bool = False, o2o_fields: bool = False,
+                        loader: "BatchLoader | None" = None,
+                        expand: Iterable[str] | None = None,
+                        limits: Mapping[str, int] | None = None) -> list[dict[str, Any]]:
+        """
+        expand lists the relations explicitly and overrides the flags.
+        limits caps backward relations: {"relation": n} dumps the relation as {"items": [...n], "has_more": bool}.
+        """
+        single, many = self._relations(m2m_fields, fk_fields, backward_fk_fields, o2o_fields, expand)
+        bounded = {field: limits[field] for field in many
+                   if limits and limits.get(field) and field in self.backward_fk_fields}
+        truncated: dict[str, set[int]] = {}
+        if instances and instances[0]._partial:
+            # Relation can't be resolved if its column wasn't selected with .only()
+            single = tuple(field for field in single if self.source_fields[field] in instances[0].__dict__)
+        if instances and (single or many):
+            for field, limit in bounded.items():
+                truncated[field] = await self._load_bounded(instances, field, limit)
+            missing = [field for field in single if not self._is_fetched(instances[0], field, False)]
+            missing += [field for field in many
+                        if field not in bounded and not self._is_fetched(instances[0], field, True)]
+            if missing and loader is not None:
+                await loader.load(instances, *missing)
+            elif missing:
+                await self.model.fetch_for_list(instances, *missing)
+
+        rows = []
+        for instance in instances:
+            row = self.to_dict(instance)
+            values = instance.__dict__
+            for field in single:
+                if (related := values.get(f"_{field}")) is not None:
+                    row[field] = self.for_model(type(related)).to_dict(related)
+            for field in many:
+                related = [self.for_model(type(obj)).to_dict(obj) for obj in values[f"_{field}"].related_objects]
+                # values_dict() always skipped empty backward relations, but kept empty m2m
+                if field in bounded:
+                    if related or expand is not None:
+                        row[field] = {"items": related, "has_more": id(instance) in truncated[field]}
+                elif related or expand is not None or field in self.m2m_fields:
+                    row[field] = related
+            rows.append(row)
+        return rows
+
+
+async def dump_models(instances: Iterable[Model], m2m_fields: bool = False, fk_fields: bool = False,
+                      backward_fk_fields: bool = False, o2o_fields: bool = False,
+                      loader: "BatchLoader | None" = None,
+                      expand: Iterable[str] | None = None) -> list[dict[str, Any]]:
+    """
+    Serializes a list of models of the same class, relations are fetched with one query per relation.
+    Pass request's BatchLoader to share already loaded rows within the request.
+    """
+    instances = list(instances)
+    if not instances:
+        return []
+    return await ModelSerializer.for_model(type(instances[0])).dump_many(
+        instances, m2m_fields=m2m_fields, fk_fields=fk_fields,
+        backward_fk_fields=backward_fk_fields, o2o_fields=o2o_fields, loader=loader, expand=expand)
@@ -2,7 +2,7 @@ import os
 
 from environs import Env
 
-from infrastructure.database.models import SystemSettings
+from infrastructure.database.prepared import SYSTEM_SETTINGS
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DEBUG = True
@@ -25,6 +25,9 @@ DB_PASSWORD = env.str('POSTGRES_PASSWORD', default='postgres')
 DB_HOST = env.str('POSTGRES_HOST', default='localhost')
 DB_PORT = env.int('POSTGRES_PORT', default=5432)
 DB_NAME = env.str('POSTGRES_DB')
+# Optional streaming replica of both databases, see infrastructure.database.pool
+DB_REPLICA_HOST = env.str('POSTGRES_REPLICA_HOST', default=None)
+DB_REPLICA_PORT = env.int('POSTGRES_REPLICA_PORT', default=DB_PORT)
 ARCHIVE_DB_NAME = env.str('ARCHIVE_DB')
 
 # --------------------------------------------Sanic server------------------------------------------------#
@@ -34,6 +37,13 @@ SANIC_PORT = env.int('SANIC_PORT', default=8000)
 SANIC_FAST = env.bool('SANIC_FAST', default=True)
 SANIC_WORKERS = 1 if DEBUG is False else 2
 
+# ------------------------------------------------Metrics------------------------------------------------#
+# Samples of every worker are written to PROMETHEUS_MULTIPROC_DIR, prometheus_client reads the variable on import,
+# so it has to be in the environment or the .env file. The main process serves them on METRICS_PORT, apart from the API
+PROMETHEUS_MULTIPROC_DIR = env.str('PROMETHEUS_MULTIPROC_DIR', default=None)
+METRICS_HOST = env.str('METRICS_HOST', default='127.0.0.1')
+METRICS_PORT = env.int('METRICS_PORT', default=None)
+
 
 # ---------------------------------------------Sanic config-----------------------------------------------#
 class SanicConfig:
@@ -69,8 +79,23 @@ CONNECTION_NAME_ARCHIVE = 'archive'
 DATETIME_FORMAT = '%d.%m.%Y %H:%M:%S'
 DATE_FORMAT = '%d.%m.%Y'
 
+# -------------------------------------------------Pagination--------------------------------------------#
+KEYSET_PAGE_SIZE = 100
+# Seconds for each statement of list and archive reads, statement_timeout of their controllers
+LIST_STATEMENT_TIMEOUT = 10
+
 # ---------------------------------------------Redis STUFF-----------------------------------------------#
 STRANGER_THINGS_EVENTS_KEY = "monitoring"
+SESSION_CACHE_KEY = "auth:session:{session_id}"
+SESSION_CACHE_USER_KEY = "auth:user:{user_id}:sessions"
+SESSION_CACHE_EVENTS_KEY = "auth:session-cache"
+SESSION_CACHE_MAX_TTL = 60 * 60 * 24
+SESSION_REVOKED_EVENTS_KEY = "auth:session-revoked"
+SESSION_STORE_KEY = "auth:live-session:{session_id}"
+AUTHZ_VERSION_KEY = "authz:version"
+AUTHZ_EVENTS_KEY = "authz:changes"
+TOTAL_COUNT_KEY = "count:{table}"
+TOTAL_COUNT_TTL = 60
 
 # ---------------------------------------------CELERY STUFF-----------------------------------------------#
 CELERY_BROKER_URL = env.str('REDIS_CREDENTIALS', 'redis://localhost:6379/0')
@@ -103,15 +128,6 @@ FLOWER_STARTUP_PARAMS = ['-A',
                          'flower',
                          '--loglevel=info']
 
-# -----------------------------------------Aerich migrations command--------------------------------------#
-AERICH_MIGRATION_COMMANDS = [
-    "pdm run aerich init-db",
-    "cd ../..",
-    "pdm run aerich init -t infrastructure.database.connection.sample_conf \
-    --location infrastructure/database/migrations -s .",
-    "pdm run aerich migrate"
-]
-
 # -------------------------------------------------Web Push-------------------------------------------------#
 VAPID_PRIVATE_KEY = env.str("VAPID_PRIVATE_KEY")
 VAPID_PUBLIC_KEY = env.str("VAPID_PUBLIC_KEY")
@@ -152,8 +168,8 @@ VISITOR_WAS_DELETED_FROM_BLACKLIST_SUBJECT = "Пользователь был у
 
 
 async def system_settings(name: str):
-    model = await SystemSettings.get_or_none(id=1).only(name)
+    value = await SYSTEM_SETTINGS[name].fetch()
     if name == "watermark_font_rgb_color":
-        color = getattr(model, name).split(",")
+        color = value.split(",")
         return tuple(map(int, color))
-    return getattr(model, name)
+    return value
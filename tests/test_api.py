@@ -26,6 +26,18 @@ class TestAuthentication:
         assert request.method.lower() == "post"
         assert resp.status == 401
 
+    async def test_logout_closes_session(self):
+        data = {
+                    "username": "root",
+                    "password": "123456"
+               }
+        _, login = await app.asgi_client.post("/auth", json=data)
+        request, resp = await app.asgi_client.delete("/auth", cookies=login.cookies)
+        assert request.method.lower() == "delete"
+        assert resp.status == 200
+        _, resp = await app.asgi_client.get("/users", cookies=login.cookies)
+        assert resp.status == 401
+
 
 class TestSystemUser:
 
@@ -39,6 +51,24 @@ class TestSystemUser:
         assert request.method.lower() == "get"
         assert resp.status == 200
 
+    async def test_users_matching_etag_returns_304(self):
+        _, resp = await app.asgi_client.get('/users/1?expand=')
+        etag = resp.headers["etag"]
+        _, resp = await app.asgi_client.get('/users/1?expand=', headers={"If-None-Match": etag})
+        assert resp.status == 304
+        assert resp.headers["etag"] == etag
+
+    async def test_users_with_relations_have_no_etag(self):
+        _, resp = await app.asgi_client.get('/users/1')
+        assert resp.status == 200
+        assert "etag" not in resp.headers
+
+    async def test_users_page_matching_etag_returns_304(self):
+        _, resp = await app.asgi_client.get('/users?limit=2')
+        etag = resp.headers["etag"]
+        _, resp = await app.asgi_client.get('/users?limit=2', headers={"If-None-Match": etag})
+        assert resp.status == 304
+
 
 class TestClaim:
 
@@ -52,6 +82,21 @@ class TestClaim:
         assert request.method.lower() == "get"
         assert resp.status == 200
 
+    async def test_claims_cursor_page_returns_envelope(self):
+        request, resp = await app.asgi_client.get('/claims?after=&limit=1&total=estimated')
+        assert resp.status == 200
+        assert set(resp.json) == {"items", "next_cursor", "total"}
+        assert len(resp.json["items"]) <= 1
+
+    async def test_claims_iso_datetimes_on_request(self):
+        request, resp = await app.asgi_client.get('/claims/1', headers={"X-Datetime-Format": "iso"})
+        assert resp.status == 200
+        assert "T" in resp.json["created_at"]
+
+    async def test_claims_invalid_cursor_returns_409(self):
+        request, resp = await app.asgi_client.get('/claims?after=garbage')
+        assert resp.status == 409
+
 
 class TestVisitor:
 
@@ -65,6 +110,21 @@ class TestVisitor:
         assert request.method.lower() == "get"
         assert resp.status == 200
 
+    async def test_visitors_raw_rows_page_returns_200(self):
+        request, resp = await app.asgi_client.get('/visitors?limit=2&offset=0')
+        assert resp.status == 200
+        assert isinstance(resp.json, list) and len(resp.json) <= 2
+
+    async def test_visitors_related_collection_is_paginated(self):
+        request, resp = await app.asgi_client.get('/visitors/1/related/visit_session?limit=1')
+        assert resp.status == 200
+        assert set(resp.json) == {"items", "next_cursor"}
+        assert len(resp.json["items"]) <= 1
+
+    async def test_visitors_unknown_related_collection_returns_404(self):
+        request, resp = await app.asgi_client.get('/visitors/1/related/passport')
+        assert resp.status == 404
+
 
 class TestPassport:
 
@@ -0,0 +1,141 @@
+"""
+EXPLAIN regression suite: hot queries of the services must not read large tables sequentially.
+Runs against its own database <POSTGRES_DB>_explain, created, seeded and dropped by the module.
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator
+
+import pytest
+import pytest_asyncio
+from tortoise import Tortoise, connections
+from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
+
+import settings
+from infrastructure.database.models import (Claim, ClaimWayApproval, Parking,
+                                            ParkingPlace, ParkingTimeslot,
+                                            Pass, SystemUser, Transport,
+                                            Visitor, VisitSession)
+
+pytestmark = pytest.mark.asyncio
+
+# Tables with at least LARGE_TABLE_ROWS rows must be read through an index
+LARGE_TABLE_ROWS = 10000
+ROWS = 20000
+OWNERS = 200
+CLAIMS = 5000
+NOW = datetime.now().astimezone()
+ARCHIVE_BEFORE = NOW - timedelta(days=60)
+
+
+async def seed() -> None:
+    await SystemUser.bulk_create([
+        SystemUser(id=i, username=f"user{i}", password="x", salt="x", first_name="First", last_name="Last")
+        for i in range(1, OWNERS + 1)
+    ])
+    await Claim.bulk_create([
+        Claim(id=i, system_user_id=i % OWNERS + 1, pass_type="разовый", status="действующая")
+        for i in range(1, CLAIMS + 1)
+    ], batch_size=5000)
+    await ClaimWayApproval.bulk_create([
+        ClaimWayApproval(claim_id=i % CLAIMS + 1, system_user_id=i % OWNERS + 1, approved=(None, False, True)[i % 3])
+        for i in range(ROWS)
+    ], batch_size=5000)
+    await Visitor.bulk_create([
+        Visitor(id=i, first_name="First", last_name="Last", claim_id=i % CLAIMS + 1, deleted=i % 50 == 0)
+        for i in range(1, ROWS + 1)
+    ], batch_size=5000)
+    await VisitSession.bulk_create([
+        VisitSession(visitor_id=i, enter=NOW - timedelta(hours=2), exit=NOW - timedelta(hours=1))
+        for i in range(1, ROWS + 1)
+    ], batch_size=5000)
+    await Pass.bulk_create([
+        Pass(rfid=str(i), pass_type="карта", valid_till_date=NOW + timedelta(days=i % 30))
+        for i in range(ROWS)
+    ], batch_size=5000)
+    parking = await Parking.create(name="гостевая", max_places=OWNERS)
+    await ParkingPlace.bulk_create([ParkingPlace(id=i, real_number=i, parking=parking) for i in range(1, OWNERS + 1)])
+    await Transport.bulk_create([Transport(id=i, number=f"A{i:05}") for i in range(1, OWNERS + 1)])
+    await ParkingTimeslot.bulk_create([
+        ParkingTimeslot(parking_place_id=i % OWNERS + 1, transport_id=i % OWNERS + 1,
+                        start=NOW + timedelta(hours=i // OWNERS), end=NOW + timedelta(hours=i // OWNERS, minutes=50))
+        for i in range(ROWS)
+    ], batch_size=5000)
+
+
+def _timeslot_overlap() -> QuerySet:
+    # ParkingTimeslotService.get_timeslots()
+    start, end = NOW + timedelta(hours=10), NOW + timedelta(hours=12)
+    return ParkingTimeslot.filter(
+        Q(parking_place=7) & Q(
+            Q(start__gte=start, end__lte=end) |
+            Q(start__lte=start, end__gte=start) |
+            Q(start__lte=end, end__gte=end) |
+            Q(start__lte=start, end__gte=end)
+        )
+    )
+
+
+HOT_QUERIES: dict[str, Callable[[], QuerySet]] = {
+    "parking timeslot overlap": _timeslot_overlap,
+    "claim approval of user": lambda: ClaimWayApproval.filter(system_user=7, claim=107).limit(1),
+    "claim approvals pending": lambda: ClaimWayApproval.filter(
+        Q(claim=107) & (Q(approved=False) | Q(approved=None))),
+    "visitors of claim": lambda: Visitor.filter(claim=107, deleted=False).limit(1),
+    "deleted visitors to archive": lambda: Visitor.filter(modified_at__lte=ARCHIVE_BEFORE, deleted=True),
+    "passes to archive": lambda: Pass.filter(modified_at__lte=ARCHIVE_BEFORE, valid_till_date__lte=ARCHIVE_BEFORE),
+    "last exit of visitor": lambda: VisitSession.filter(visitor=107).order_by("-exit").limit(1),
+    "visitors keyset page": lambda: Visitor.filter(created_at__gte=NOW).filter(
+        Q(created_at__gt=NOW) | Q(id__gt=107)).order_by("created_at", "id").limit(settings.KEYSET_PAGE_SIZE + 1),
+}
+
+
+@pytest.fixture(scope="module")
+def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def large_tables() -> set[str]:
+    await Tortoise.init(config={
+        "connections": {
+            settings.CONNECTION_NAME: f"postgres://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:"
+                                      f"{settings.DB_PORT}/{settings.DB_NAME}_explain",
+        },
+        "apps": {
+            settings.CONNECTION_NAME: {"models": ["infrastructure.database.models"],
+                                       "default_connection": settings.CONNECTION_NAME},
+        },
+    }, _create_db=True)
+    try:
+        await Tortoise.generate_schemas()
+        await seed()
+        connection = connections.get(settings.CONNECTION_NAME)
+        await connection.execute_script("ANALYZE")
+        # reltuples is set by ANALYZE, statistics views may lag behind
+        _, rows = await connection.execute_query(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND reltuples >= $1", [LARGE_TABLE_ROWS])
+        yield {row["relname"] for row in rows}
+    finally:
+        await Tortoise._drop_databases()
+
+
+def _seq_scans(plan: dict[str, Any]) -> Iterator[str]:
+    if plan["Node Type"] == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", ()):
+        yield from _seq_scans(child)
+
+
+class TestHotQueryPlans:
+
+    @pytest.mark.parametrize("name", HOT_QUERIES)
+    async def test_no_sequential_scan_on_large_tables(self, name: str, large_tables: set[str]):
+        explained = (await HOT_QUERIES[name]().explain())[0]["QUERY PLAN"]
+        plan = (json.loads(explained) if isinstance(explained, str) else explained)[0]["Plan"]
+        scanned = set(_seq_scans(plan)) & large_tables
+        assert not scanned, f"{name}: sequential scan of {sorted(scanned)}\n{json.dumps(plan, indent=2)}"
@@ -0,0 +1,77 @@
+"""
+Shipped migrations must bring a database to the schema of the models: existing databases get
+model changes only through them. Runs against its own databases <POSTGRES_DB>_migrations and
+<POSTGRES_DB>_models, created and dropped by the module.
+"""
+import asyncio
+from typing import Awaitable, Callable, Iterator
+
+import pytest
+import pytest_asyncio
+from aerich.utils import get_version_content_from_file
+from tortoise import Tortoise, connections
+
+import settings
+from infrastructure.database.init_db import shipped_migrations
+
+pytestmark = pytest.mark.asyncio
+
+Schema = tuple[set[tuple], set[str]]
+
+
+@pytest.fixture(scope="module")
+def event_loop() -> Iterator[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+async def snapshot(database: str, build: Callable[[], Awaitable[None]]) -> Schema:
+    await Tortoise.init(config={
+        "connections": {
+            settings.CONNECTION_NAME: f"postgres://{settings.DB_USER}:{settings.DB_PASSWORD}@{settings.DB_HOST}:"
+                                      f"{settings.DB_PORT}/{database}",
+        },
+        "apps": {
+            settings.CONNECTION_NAME: {"models": settings.ASBP_MODELS,
+                                       "default_connection": settings.CONNECTION_NAME},
+        },
+    }, _create_db=True)
+    try:
+        await build()
+        connection = connections.get(settings.CONNECTION_NAME)
+        _, columns = await connection.execute_query(
+            "SELECT table_name, column_name, data_type, is_nullable, column_default "
+            "FROM information_schema.columns WHERE table_schema = 'public'")
+        _, indexes = await connection.execute_query(
+            "SELECT indexdef FROM pg_indexes WHERE schemaname = 'public'")
+        return {tuple(row.values()) for row in columns}, {row["indexdef"] for row in indexes}
+    finally:
+        await Tortoise._drop_databases()
+
+
+async def migrate() -> None:
+    connection = connections.get(settings.CONNECTION_NAME)
+    for version in shipped_migrations():
+        for statement in get_version_content_from_file(version)["upgrade"]:
+            await connection.execute_script(statement)
+
+
+@pytest_asyncio.fixture(scope="module")
+async def schemas() -> tuple[Schema, Schema]:
+    migrated = await snapshot(f"{settings.DB_NAME}_migrations", migrate)
+    generated = await snapshot(f"{settings.DB_NAME}_models", Tortoise.generate_schemas)
+    return migrated, generated
+
+
+class TestMigrations:
+
+    async def test_columns_match_models(self, schemas: tuple[Schema, Schema]):
+        (migrated, _), (generated, _) = schemas
+        assert migrated == generated, (f"missing: {sorted(generated - migrated)}\n"
+                                       f"extra: {sorted(migrated - generated)}")
+
+    async def test_indexes_match_models(self, schemas: tuple[Schema, Schema]):
+        (_, migrated), (_, generated) = schemas
+        assert migrated == generated, (f"missing: {sorted(generated - migrated)}\n"
+                                       f"extra: {sorted(migrated - generated)}")